@@ -20,7 +20,7 @@ app = FastAPI(title="CogniGuard API")
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import ClaimAnalyzer
-from cogniguard.claim_analyzer import ClaimAnalyzer
+from cogniguard.claim_analyzer import get_shared_analyzer
 
 
 # What user sends to us
@@ -53,14 +53,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create analyzer once
-analyzer = None
-
+# Create analyzer once, on first use
 def get_analyzer():
-    global analyzer
-    if analyzer is None:
-        analyzer = ClaimAnalyzer()
-    return analyzer
+    return get_shared_analyzer()
 
 
 # HOME PAGE
@@ -10,12 +10,13 @@ CogniGuard - AI Security Platform
 __version__ = "1.0.0"
 # Core detection (always try to load)
 try:
-    from .detection_engine import CogniGuardEngine, ThreatLevel, DetectionResult
+    from .detection_engine import CogniGuardEngine, ThreatLevel, DetectionResult, get_engine
 except ImportError as e:
     print(f"Warning: Could not import detection_engine: {e}")
     CogniGuardEngine = None
     ThreatLevel = None
     DetectionResult = None
+    get_engine = None
 
 # Enhanced detection
 try:
@@ -59,16 +60,18 @@ CogniGuard Core Module
 
 # Import with error handling
 try:
-    from .detection_engine import CogniGuardEngine, ThreatLevel, DetectionResult
+    from .detection_engine import CogniGuardEngine, ThreatLevel, DetectionResult, get_engine
 except ImportError:
     CogniGuardEngine = None
     ThreatLevel = None
     DetectionResult = None
+    get_engine = None
 
 try:
-    from .claim_analyzer import ClaimAnalyzer, PerturbationType, NoiseBudget
+    from .claim_analyzer import ClaimAnalyzer, PerturbationType, NoiseBudget, get_shared_analyzer
 except ImportError:
     ClaimAnalyzer = None
+    get_shared_analyzer = None
     PerturbationType = None
     NoiseBudget = None
 
@@ -82,7 +85,9 @@ __all__ = [
     'CogniGuardEngine',
     'ThreatLevel',
     'DetectionResult',
+    'get_engine',
     'ClaimAnalyzer',
+    'get_shared_analyzer',
     'PerturbationType',
     'NoiseBudget',
     'IntegratedAnalyzer',
@@ -91,12 +96,13 @@ __all__ = [
 
 # Claim Generator (NEW!)
 try:
-    from .claim_generator import ClaimGenerator, GenerationResult
+    from .claim_generator import ClaimGenerator, GenerationResult, get_shared_generator
     from .claim_generator import PerturbationType as GenPerturbationType
     from .claim_generator import NoiseBudget as GenNoiseBudget
 except ImportError as e:
     print(f"Note: Claim generator not available: {e}")
     ClaimGenerator = None
+    get_shared_generator = None
 
 # Claim Constraint (NEW!)
 try:
@@ -0,0 +1,23 @@
+"""
+Small helpers shared across the cogniguard modules.
+"""
+
+import sys
+
+# __slots__ drops the per-instance __dict__ (dataclass slots need 3.10+)
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def collect_hyperscan_id(pattern_id, start, end, flags, matched_ids):
+    """Hyperscan match handler: record the pattern ID and keep scanning"""
+    matched_ids.append(pattern_id)
+
+
+def thread_scratch(database, local):
+    """The calling thread's scratch space for a Hyperscan database"""
+    # A scratch space can only serve one scan at a time, so each thread
+    # clones its own from the database's instead of sharing it
+    scratch = getattr(local, 'scratch', None)
+    if scratch is None:
+        scratch = local.scratch = database.scratch.clone()
+    return scratch
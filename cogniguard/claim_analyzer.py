@@ -12,10 +12,28 @@ Detects 6 perturbation types:
 """
 
 import re
+import threading
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import Callable, Iterable, List, Dict, Optional
 from enum import Enum
 
+from ._compat import SLOTS, collect_hyperscan_id, thread_scratch
+
+# Optional: Aho-Corasick automata for the word lists (pip install
+# pyahocorasick). Falls back to one regex alternation per list.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional: Hyperscan checks the evasion and double-negation regexes in
+# one pass (pip install hyperscan). Falls back to running each of them.
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 
 class PerturbationType(Enum):
     """The 6 perturbation types from the paper"""
@@ -31,9 +49,17 @@ class NoiseBudget(Enum):
     """Low = minimal changes, High = substantial changes"""
     LOW = "low"
     HIGH = "high"
+    
+    @property
+    def bit(self) -> int:
+        """This budget's flag in ClaimAnalysisResult.noise_mask"""
+        return _NOISE_BITS[self]
+
 
+_NOISE_BITS = {NoiseBudget.LOW: 1, NoiseBudget.HIGH: 2}
 
-@dataclass
+
+@dataclass(**SLOTS)
 class PerturbationResult:
     """Result for one detected perturbation"""
     original_claim: str
@@ -45,7 +71,7 @@ class PerturbationResult:
     explanation: str
 
 
-@dataclass
+@dataclass(**SLOTS)
 class ClaimAnalysisResult:
     """Complete analysis result"""
     input_claim: str
@@ -55,6 +81,172 @@ class ClaimAnalysisResult:
     normalized_claim: str
     robustness_score: float
     recommendations: List[str]
+    # NoiseBudget.bit of every detected perturbation OR'd together, so
+    # "any HIGH noise?" is noise_mask & NoiseBudget.HIGH.bit
+    noise_mask: int = 0
+
+
+# Maximal runs of word characters. A plain word matches \bword\b exactly
+# when it is one of these runs
+_WORD_RUN = re.compile(r'\w+')
+
+
+def _is_word_char(char: str) -> bool:
+    """Whether char is a regex word character (what a word boundary checks)"""
+    return char.isalnum() or char == '_'
+
+
+def _rewriter(rewrites: Iterable) -> Callable[[str], str]:
+    """
+    Case-insensitive text -> text function applying every (pattern,
+    replacement) pair in a single re.sub pass
+    
+    The patterns become named alternatives, and the name of the one that
+    matched picks the replacement.
+    """
+    replacements = {}
+    alternatives = []
+    for i, (pattern, replacement) in enumerate(rewrites):
+        replacements[f'r{i}'] = replacement
+        alternatives.append(f'(?P<r{i}>{pattern})')
+    combined = re.compile('|'.join(alternatives), re.IGNORECASE)
+    
+    def rewrite(text: str) -> str:
+        return combined.sub(lambda match: replacements[match.lastgroup], text)
+    return rewrite
+
+
+def _scanner(words: List[str], whole_words: bool) -> Callable[[str], List[str]]:
+    """
+    text -> every occurrence of words in it, in text order
+    
+    With whole_words, an occurrence only counts with a word boundary on
+    both sides. Uses an Aho-Corasick automaton when pyahocorasick is
+    installed, otherwise one compiled alternation.
+    """
+    if ahocorasick is None:
+        edge = r'\b' if whole_words else ''
+        union = re.compile('|'.join(edge + re.escape(word) + edge for word in words))
+        return union.findall
+    
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    if not whole_words:
+        return lambda text: [word for _, word in automaton.iter(text)]
+    
+    def scan(text: str) -> List[str]:
+        found = []
+        for end, word in automaton.iter(text):
+            start = end - len(word) + 1
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if end + 1 < len(text) and _is_word_char(text[end + 1]):
+                continue
+            found.append(word)
+        return found
+    return scan
+
+
+# ASCII characters re's \s matches but Hyperscan's doesn't; the screen
+# sees them as plain spaces
+_RE_ONLY_SPACES = str.maketrans('\x1c\x1d\x1e\x1f', '    ')
+
+
+class _ClaimText:
+    """
+    One claim as the detectors read it, prepared once per analysis
+    
+    lower is the lowercased claim, word_runs its set of _WORD_RUN matches,
+    regex_hits the screened regexes that matched it and keyword_hits the
+    fused keyword scan's occurrences per _WordList. Either of the last two
+    is None when that scan isn't available, and the detectors then do the
+    work themselves.
+    """
+    
+    __slots__ = ('lower', 'word_runs', 'regex_hits', 'keyword_hits')
+    
+    def __init__(self, lower: str, word_runs: frozenset,
+                 regex_hits: Optional[frozenset], keyword_hits: Optional[Dict]):
+        self.lower = lower
+        self.word_runs = word_runs
+        self.regex_hits = regex_hits
+        self.keyword_hits = keyword_hits
+    
+    def may_match(self, pattern) -> bool:
+        """False only if the screen says pattern can't match"""
+        return self.regex_hits is None or pattern in self.regex_hits
+
+
+class _WordList:
+    """
+    Literal words or phrases, found in a claim
+    
+    Plain whole words (no spaces or apostrophes) are answered from the
+    claim's word runs with a set intersection, so only the phrases need a
+    scan of the text. A counted list needs every occurrence, so all its
+    words are scanned.
+    """
+    
+    def __init__(self, words: Iterable[str], whole_words: bool = True,
+                 counted: bool = False):
+        self.words = list(words)
+        self.whole_words = whole_words
+        self._word_set = frozenset(
+            word for word in self.words if whole_words and _WORD_RUN.fullmatch(word)
+        )
+        self.scanned = (self.words if counted else
+                        [word for word in self.words if word not in self._word_set])
+        self._scan = _scanner(self.scanned, whole_words) if self.scanned else None
+    
+    def matches(self, text: _ClaimText) -> List[str]:
+        """Every occurrence of a scanned word, in text order"""
+        if text.keyword_hits is not None:
+            return text.keyword_hits.get(self, [])
+        if self._scan is None:
+            return []
+        return self._scan(text.lower)
+    
+    def found(self, text: _ClaimText) -> List[str]:
+        """The distinct words present, in list order"""
+        seen = self._word_set & text.word_runs
+        occurrences = self.matches(text)
+        if occurrences:
+            seen = seen.union(occurrences)
+        return [word for word in self.words if word in seen]
+
+
+class _FusedScan:
+    """
+    Every _WordList's scanned words in one Aho-Corasick automaton
+    
+    One pass over a claim yields the occurrences for all the lists at
+    once, each checked against its own list's word-boundary rule.
+    Requires pyahocorasick.
+    """
+    
+    def __init__(self, word_lists: Iterable[_WordList]):
+        owners = {}  # word -> the lists scanning it
+        for word_list in word_lists:
+            for word in word_list.scanned:
+                owners.setdefault(word, []).append(word_list)
+        self._automaton = ahocorasick.Automaton()
+        for word, lists in owners.items():
+            self._automaton.add_word(word, (word, tuple(lists)))
+        self._automaton.make_automaton()
+    
+    def scan(self, text: str) -> Dict[_WordList, List[str]]:
+        """word list -> occurrences of its scanned words, in text order"""
+        hits = {}
+        for end, (word, lists) in self._automaton.iter(text):
+            start = end - len(word) + 1
+            bounded = ((start == 0 or not _is_word_char(text[start - 1])) and
+                       (end + 1 == len(text) or not _is_word_char(text[end + 1])))
+            for word_list in lists:
+                if bounded or not word_list.whole_words:
+                    hits.setdefault(word_list, []).append(word)
+        return hits
 
 
 class ClaimAnalyzer:
@@ -67,19 +259,41 @@ class ClaimAnalyzer:
         print(result.is_perturbed)  # True
     """
     
-    def __init__(self):
-        """Set up all detection patterns"""
+    def __init__(self, verbose: bool = True):
+        """
+        Set up all detection patterns
+        
+        Args:
+            verbose: Print the startup banner
+        """
         self._setup_patterns()
-        print("📊 Claim Analyzer initialized!")
-        print("   Detecting 6 perturbation types from ACL 2025 paper")
+        
+        # Fact-check traffic repeats claims, so results are memoized.
+        # Per instance, so the cache doesn't keep the analyzer alive
+        self._analyze_cached = lru_cache(maxsize=4096)(self._analyze)
+        
+        # Every detector, in report order. They share one signature
+        # (claim, _ClaimText) so _analyze can run them in a loop
+        self._detectors = (
+            self._detect_casing,
+            self._detect_typos,
+            self._detect_negation,
+            self._detect_entity_replacement,
+            self._detect_llm_rewrite,
+            self._detect_dialect,
+        )
+        if verbose:
+            print("📊 Claim Analyzer initialized!")
+            print("   Detecting 6 perturbation types from ACL 2025 paper")
     
     def _setup_patterns(self):
         """Define all detection patterns"""
         
-        # CASING patterns
+        # CASING patterns (all caps / all lowercase are str.isupper() and
+        # str.islower(), which need no regex). Those need at least one cased
+        # letter, accept non-ASCII letters, and treat '_' like any other
+        # caseless character, so 'IMPOSSIBLE_UNTRUE' counts as all caps
         self.casing_patterns = {
-            'all_caps': r'^[A-Z\s\d\W]+$',
-            'all_lower': r'^[a-z\s\d\W]+$',
             'mixed_weird': r'[a-z][A-Z][a-z]',
         }
         
@@ -188,51 +402,227 @@ class ClaimAnalyzer:
                 r'\bnuh\b',
             ],
         }
-    
-    def analyze(self, claim: str) -> ClaimAnalysisResult:
-        """Analyze a claim for all 6 perturbation types"""
-        perturbations = []
         
-        # Check each type
-        casing = self._detect_casing(claim)
-        if casing:
-            perturbations.append(casing)
-        
-        typos = self._detect_typos(claim)
-        if typos:
-            perturbations.append(typos)
+        # Normalization rewrites
+        self.abbreviations = {
+            r'\bu\b': 'you',
+            r'\bur\b': 'your',
+            r'\br\b': 'are',
+            r'\bb4\b': 'before',
+            r'\bcuz\b': 'because',
+            r'\bthru\b': 'through',
+            r'\bppl\b': 'people',
+            r'\bgovt\b': 'government',
+        }
+        self.double_negation_fixes = [
+            (r'not\s+untrue', 'true'),
+            (r'not\s+incorrect', 'correct'),
+            (r'not\s+inaccurate', 'accurate'),
+            (r'not\s+impossible', 'possible'),
+            (r'not\s+ineffective', 'effective'),
+            (r'not\s+unsafe', 'safe'),
+        ]
         
-        negation = self._detect_negation(claim)
-        if negation:
-            perturbations.append(negation)
+        self._compile_patterns()
+    
+    def _compile_patterns(self):
+        """
+        Compile every pattern above once
+        
+        The regex tables keep their source (evidence strings quote it via
+        .pattern), but detectors only ever see compiled patterns, so
+        analyze() never goes through re's pattern cache.
+        
+        The word lists (slang, single negations, vague entities, LLM
+        phrases, each dialect) each become one _WordList, so a detector
+        scans the claim once instead of once per word. All of their
+        entries are literal words or phrases.
+        
+        These stay on the standard re module even when google-re2 is
+        installed (unlike DetectionEngine's rules): RE2's \\w, \\b and \\s
+        are ASCII-only, which would change matches on accented text, and
+        for claim-length input its per-call overhead costs more than the
+        scan itself. None of the patterns can backtrack badly.
+        """
+        self.casing_patterns = {name: re.compile(p) for name, p in self.casing_patterns.items()}
+        self._lone_i = re.compile(r'\bi\b')
+        # Leetspeak is undone with one translate() pass instead of a
+        # replace() per character
+        self._leet_table = str.maketrans(dict(self.leetspeak_map))
+        self._leet_chars = frozenset(number for number, _ in self.leetspeak_map)
+        self.evasion_patterns = [(re.compile(p), correct) for p, correct in self.evasion_patterns]
+        self._evasion_fixes = [(re.compile(p.pattern, re.IGNORECASE), correct)
+                               for p, correct in self.evasion_patterns]
+        self.double_negation_patterns = [re.compile(p) for p in self.double_negation_patterns]
+        self._regex_screen = self._build_regex_screen()
+        self._screen_local = threading.local()
+        
+        def words(patterns):
+            return [p.replace(r'\b', '') for p in patterns]
+        
+        self._slang = _WordList(self.slang_words)
+        self._single_negations = _WordList(words(self.single_negation_patterns), counted=True)
+        self._vague_entities = _WordList(self.vague_entity_patterns, whole_words=False)
+        self._llm_indicators = _WordList(words(self.llm_indicator_patterns))
+        # Every dialect's markers in one list (dialect by dialect, so each
+        # dialect's hits come out in table order), scanned once per claim
+        self._dialect_words = _WordList(dict.fromkeys(
+            marker for markers in self.dialect_markers.values() for marker in words(markers)
+        ))
+        self._marker_dialects = {}
+        for name, markers in self.dialect_markers.items():
+            for marker in words(markers):
+                self._marker_dialects.setdefault(marker, []).append(name)
+        
+        # With pyahocorasick, the phrases of every list above are found in
+        # a single pass over the claim, shared by all the detectors
+        self._keyword_scan = None
+        if ahocorasick is not None:
+            self._keyword_scan = _FusedScan([
+                self._slang, self._single_negations, self._vague_entities,
+                self._llm_indicators, self._dialect_words,
+            ])
+        
+        # Cheap substring gates: a detector whose triggers are all absent
+        # can't find anything, so it returns before its regex work. Every
+        # negation pattern contains one of these, and every vague entity
+        # starts with its trigger
+        self._negation_triggers = ('no', "n't", 'never')
+        self._entity_triggers = tuple(dict.fromkeys(
+            phrase.split()[0] for phrase in self.vague_entity_patterns
+        ))
+        # Each rewrite table becomes one pass over the text. No replacement
+        # is matched by another entry, so this equals applying them in turn
+        self._expand_abbreviations = _rewriter(self.abbreviations.items())
+        self._resolve_negations = _rewriter(self.double_negation_fixes)
+    
+    def _build_regex_screen(self):
+        """
+        Build one Hyperscan database over the evasion and double-negation
+        regexes
+        
+        Pattern IDs index self._screened_patterns.
+        
+        Returns:
+            The database, or None if hyperscan is not installed or the
+            patterns fail to compile
+        """
+        self._screened_patterns = ([p for p, _ in self.evasion_patterns]
+                                   + self.double_negation_patterns)
+        if hyperscan is None:
+            return None
         
-        entity = self._detect_entity_replacement(claim)
-        if entity:
-            perturbations.append(entity)
+        expressions = [p.pattern.encode() for p in self._screened_patterns]
+        database = hyperscan.Database()
+        try:
+            database.compile(expressions=expressions, ids=list(range(len(expressions))),
+                             elements=len(expressions),
+                             flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions))
+        except hyperscan.error:
+            return None
+        return database
+    
+    def _screen_regexes(self, claim_lower: str) -> Optional[frozenset]:
+        """
+        The screened regexes that match claim_lower, in one scan
+        
+        Returns None (run them all) without Hyperscan, or for non-ASCII
+        text, where its byte-wise character classes differ from re's.
+        """
+        if self._regex_screen is None or not claim_lower.isascii():
+            return None
         
-        llm = self._detect_llm_rewrite(claim)
-        if llm:
-            perturbations.append(llm)
+        matched_ids = []
+        self._regex_screen.scan(claim_lower.translate(_RE_ONLY_SPACES).encode('ascii'),
+                                match_event_handler=collect_hyperscan_id,
+                                context=matched_ids,
+                                scratch=thread_scratch(self._regex_screen, self._screen_local))
+        return frozenset(self._screened_patterns[i] for i in matched_ids)
+    
+    def analyze(self, claim: str) -> ClaimAnalysisResult:
+        """
+        Analyze a claim for all 6 perturbation types
+        
+        A repeated claim gets the same result object back, so treat
+        results as read-only.
+        """
+        if not claim or claim.isspace():
+            # Nothing for any detector to match (common with streaming or
+            # autocomplete input), so skip them and the cache
+            return ClaimAnalysisResult(
+                input_claim=claim,
+                is_perturbed=False,
+                perturbations_detected=[],
+                overall_confidence=0.0,
+                normalized_claim=claim,
+                robustness_score=1.0,
+                recommendations=self._generate_recommendations([])
+            )
+        return self._analyze_cached(claim)
+    
+    def analyze_many(self, claims: Iterable[str]) -> List[ClaimAnalysisResult]:
+        """
+        Analyze a batch of claims (fact-check batches, log ingestion)
+        
+        Results come back in input order. Each distinct claim is analyzed
+        once per batch, however large the batch is compared to the cache.
+        """
+        results = {}
+        analyze = self.analyze
+        out = []
+        for claim in claims:
+            result = results.get(claim)
+            if result is None:
+                result = results[claim] = analyze(claim)
+            out.append(result)
+        return out
+    
+    def get_cache_stats(self) -> Dict:
+        """Hit/miss counters and current size of the result cache"""
+        cache_info = self._analyze_cached.cache_info()
+        return {
+            'hits': cache_info.hits,
+            'misses': cache_info.misses,
+            'size': cache_info.currsize
+        }
+    
+    def clear_cache(self):
+        """Forget every cached result"""
+        self._analyze_cached.cache_clear()
+    
+    def _analyze(self, claim: str) -> ClaimAnalysisResult:
+        """Run every detector on a claim (uncached)"""
+        # Lowercased, split into words and screened once for every detector
+        claim_lower = claim.lower()
+        text = _ClaimText(
+            claim_lower,
+            frozenset(_WORD_RUN.findall(claim_lower)),
+            self._screen_regexes(claim_lower),
+            self._keyword_scan.scan(claim_lower) if self._keyword_scan is not None else None,
+        )
         
-        dialect = self._detect_dialect(claim)
-        if dialect:
-            perturbations.append(dialect)
+        # Check each type
+        perturbations = []
+        for detect in self._detectors:
+            found = detect(claim, text)
+            if found:
+                perturbations.append(found)
         
         # Calculate metrics
         is_perturbed = len(perturbations) > 0
         
+        # Overall confidence, robustness score and the noise budgets seen,
+        # in one pass over the (at most six) perturbations
         overall_confidence = 0.0
-        if perturbations:
-            overall_confidence = max(p.confidence for p in perturbations)
-        
-        # Robustness score
         robustness = 1.0
+        noise_mask = 0
         for p in perturbations:
-            if p.noise_budget == NoiseBudget.HIGH:
-                robustness -= 0.2 * p.confidence
-            else:
-                robustness -= 0.1 * p.confidence
-        robustness = max(0.0, min(1.0, robustness))
+            confidence = p.confidence
+            if confidence > overall_confidence:
+                overall_confidence = confidence
+            noise_mask |= _NOISE_BITS[p.noise_budget]
+            robustness -= (0.2 if p.noise_budget is NoiseBudget.HIGH else 0.1) * confidence
+        robustness = 0.0 if robustness < 0.0 else (1.0 if robustness > 1.0 else robustness)
         
         recommendations = self._generate_recommendations(perturbations)
         normalized = self._normalize_claim(claim)
@@ -244,10 +634,11 @@ class ClaimAnalyzer:
             overall_confidence=overall_confidence,
             normalized_claim=normalized,
             robustness_score=robustness,
-            recommendations=recommendations
+            recommendations=recommendations,
+            noise_mask=noise_mask
         )
     
-    def _detect_casing(self, claim: str) -> Optional[PerturbationResult]:
+    def _detect_casing(self, claim: str, text: "_ClaimText") -> Optional[PerturbationResult]:
         """Detect casing perturbations"""
         evidence = []
         noise_budget = NoiseBudget.LOW
@@ -257,20 +648,20 @@ class ClaimAnalyzer:
             return None
         
         # Check ALL CAPS
-        if re.match(self.casing_patterns['all_caps'], claim):
+        if claim.isupper():
             evidence.append("Text is ALL UPPERCASE")
             noise_budget = NoiseBudget.HIGH
             confidence = 0.9
         
         # Check all lowercase
-        elif re.match(self.casing_patterns['all_lower'], claim):
-            if re.search(r'\bi\b', claim):
+        elif claim.islower():
+            if self._lone_i.search(claim):
                 evidence.append("Text is all lowercase (missing capitals)")
                 noise_budget = NoiseBudget.HIGH
                 confidence = 0.7
         
         # Check weird mixed casing
-        elif re.search(self.casing_patterns['mixed_weird'], claim):
+        elif self.casing_patterns['mixed_weird'].search(claim):
             evidence.append("Unusual mixed casing detected")
             noise_budget = NoiseBudget.HIGH
             confidence = 0.85
@@ -288,19 +679,17 @@ class ClaimAnalyzer:
         
         return None
     
-    def _detect_typos(self, claim: str) -> Optional[PerturbationResult]:
+    def _detect_typos(self, claim: str, text: "_ClaimText") -> Optional[PerturbationResult]:
         """Detect typo perturbations"""
         evidence = []
         noise_budget = NoiseBudget.LOW
         confidence = 0.0
         
-        claim_lower = claim.lower()
-        
         # Check leetspeak
         leetspeak_found = []
-        for number, letter in self.leetspeak_map:
-            if number in claim:
-                leetspeak_found.append(f"'{number}' for '{letter}'")
+        if not self._leet_chars.isdisjoint(claim):
+            leetspeak_found = [f"'{number}' for '{letter}'"
+                               for number, letter in self.leetspeak_map if number in claim]
         
         if leetspeak_found:
             evidence.append(f"Leetspeak: {', '.join(leetspeak_found[:3])}")
@@ -311,11 +700,7 @@ class ClaimAnalyzer:
                 confidence = max(confidence, 0.6)
         
         # Check slang
-        slang_found = []
-        for slang in self.slang_words:
-            pattern = r'\b' + re.escape(slang) + r'\b'
-            if re.search(pattern, claim_lower):
-                slang_found.append(slang)
+        slang_found = self._slang.found(text)
         
         if slang_found:
             evidence.append(f"Slang: {', '.join(slang_found[:3])}")
@@ -327,8 +712,8 @@ class ClaimAnalyzer:
         
         # Check evasion spellings
         for pattern, correct in self.evasion_patterns:
-            if re.search(pattern, claim_lower):
-                evidence.append(f"Evasion spelling: '{pattern}' for '{correct}'")
+            if text.may_match(pattern) and pattern.search(text.lower):
+                evidence.append(f"Evasion spelling: '{pattern.pattern}' for '{correct}'")
                 noise_budget = NoiseBudget.HIGH
                 confidence = max(confidence, 0.9)
         
@@ -345,17 +730,20 @@ class ClaimAnalyzer:
         
         return None
     
-    def _detect_negation(self, claim: str) -> Optional[PerturbationResult]:
+    def _detect_negation(self, claim: str, text: "_ClaimText") -> Optional[PerturbationResult]:
         """Detect negation perturbations"""
+        if not any(trigger in text.lower for trigger in self._negation_triggers):
+            return None
+        
         evidence = []
         noise_budget = NoiseBudget.LOW
         confidence = 0.0
         
-        claim_lower = claim.lower()
-        
         # Check double negations first
         for pattern in self.double_negation_patterns:
-            matches = re.findall(pattern, claim_lower)
+            if not text.may_match(pattern):
+                continue
+            matches = pattern.findall(text.lower)
             if matches:
                 for match in matches:
                     evidence.append(f"Double negation: '{match}'")
@@ -363,11 +751,9 @@ class ClaimAnalyzer:
                 confidence = max(confidence, 0.9)
         
         # Count single negations
-        negation_count = 0
-        for pattern in self.single_negation_patterns:
-            negation_count += len(re.findall(pattern, claim_lower))
+        negation_count = len(self._single_negations.matches(text))
         
-        if negation_count >= 3 and noise_budget != NoiseBudget.HIGH:
+        if negation_count >= 3 and noise_budget is not NoiseBudget.HIGH:
             evidence.append(f"Multiple negations: {negation_count} found")
             noise_budget = NoiseBudget.HIGH
             confidence = max(confidence, 0.7)
@@ -375,7 +761,7 @@ class ClaimAnalyzer:
             evidence.append(f"Negation present: {negation_count} found")
             confidence = max(confidence, 0.3)
         
-        if evidence and (noise_budget == NoiseBudget.HIGH or negation_count >= 2):
+        if evidence and (noise_budget is NoiseBudget.HIGH or negation_count >= 2):
             return PerturbationResult(
                 original_claim=claim,
                 perturbation_type=PerturbationType.NEGATION,
@@ -388,18 +774,16 @@ class ClaimAnalyzer:
         
         return None
     
-    def _detect_entity_replacement(self, claim: str) -> Optional[PerturbationResult]:
+    def _detect_entity_replacement(self, claim: str, text: "_ClaimText") -> Optional[PerturbationResult]:
         """Detect entity replacement perturbations"""
+        if not any(trigger in text.lower for trigger in self._entity_triggers):
+            return None
+        
         evidence = []
         noise_budget = NoiseBudget.LOW
         confidence = 0.0
         
-        claim_lower = claim.lower()
-        
-        vague_found = []
-        for pattern in self.vague_entity_patterns:
-            if re.search(pattern, claim_lower):
-                vague_found.append(pattern)
+        vague_found = self._vague_entities.found(text)
         
         if vague_found:
             evidence.append(f"Vague references: {', '.join(vague_found[:3])}")
@@ -423,19 +807,12 @@ class ClaimAnalyzer:
         
         return None
     
-    def _detect_llm_rewrite(self, claim: str) -> Optional[PerturbationResult]:
+    def _detect_llm_rewrite(self, claim: str, text: "_ClaimText") -> Optional[PerturbationResult]:
         """Detect LLM rewrite indicators"""
         evidence = []
         confidence = 0.0
         
-        claim_lower = claim.lower()
-        
-        indicators_found = []
-        for pattern in self.llm_indicator_patterns:
-            if re.search(pattern, claim_lower):
-                match = re.search(pattern, claim_lower)
-                if match:
-                    indicators_found.append(match.group())
+        indicators_found = self._llm_indicators.found(text)
         
         if indicators_found:
             evidence.append(f"LLM phrases: {', '.join(indicators_found[:3])}")
@@ -459,17 +836,15 @@ class ClaimAnalyzer:
         
         return None
     
-    def _detect_dialect(self, claim: str) -> Optional[PerturbationResult]:
+    def _detect_dialect(self, claim: str, text: "_ClaimText") -> Optional[PerturbationResult]:
         """Detect dialect perturbations"""
-        claim_lower = claim.lower()
+        by_dialect = {}
+        for marker in self._dialect_words.found(text):
+            for dialect_name in self._marker_dialects[marker]:
+                by_dialect.setdefault(dialect_name, []).append(marker)
         
-        for dialect_name, markers in self.dialect_markers.items():
-            found_markers = []
-            
-            for marker in markers:
-                if re.search(marker, claim_lower):
-                    clean_marker = marker.replace(r'\b', '')
-                    found_markers.append(clean_marker)
+        for dialect_name in self.dialect_markers:
+            found_markers = by_dialect.get(dialect_name, ())
             
             if len(found_markers) >= 2:
                 dialect_display = {
@@ -500,55 +875,25 @@ class ClaimAnalyzer:
             normalized = normalized.capitalize()
         
         # Fix leetspeak
-        for number, letter in self.leetspeak_map:
-            normalized = normalized.replace(number, letter)
+        normalized = normalized.translate(self._leet_table)
         
         # Expand abbreviations
-        abbreviations = {
-            r'\bu\b': 'you',
-            r'\bur\b': 'your',
-            r'\br\b': 'are',
-            r'\bb4\b': 'before',
-            r'\bcuz\b': 'because',
-            r'\bthru\b': 'through',
-            r'\bppl\b': 'people',
-            r'\bgovt\b': 'government',
-        }
-        
-        for pattern, replacement in abbreviations.items():
-            normalized = re.sub(pattern, replacement, normalized, flags=re.IGNORECASE)
+        normalized = self._expand_abbreviations(normalized)
         
         return normalized
     
     def _fix_typos(self, claim: str) -> str:
         """Fix common typos"""
-        fixed = claim
+        fixed = claim.translate(self._leet_table)
         
-        for number, letter in self.leetspeak_map:
-            fixed = fixed.replace(number, letter)
-        
-        for pattern, correct in self.evasion_patterns:
-            fixed = re.sub(pattern, correct, fixed, flags=re.IGNORECASE)
+        for pattern, correct in self._evasion_fixes:
+            fixed = pattern.sub(correct, fixed)
         
         return fixed
     
     def _resolve_double_negation(self, claim: str) -> str:
         """Resolve double negations"""
-        resolved = claim
-        
-        replacements = [
-            (r'not\s+untrue', 'true'),
-            (r'not\s+incorrect', 'correct'),
-            (r'not\s+inaccurate', 'accurate'),
-            (r'not\s+impossible', 'possible'),
-            (r'not\s+ineffective', 'effective'),
-            (r'not\s+unsafe', 'safe'),
-        ]
-        
-        for pattern, replacement in replacements:
-            resolved = re.sub(pattern, replacement, resolved, flags=re.IGNORECASE)
-        
-        return resolved
+        return self._resolve_negations(claim)
     
     def _generate_recommendations(self, perturbations: List[PerturbationResult]) -> List[str]:
         """Generate recommendations"""
@@ -558,17 +903,17 @@ class ClaimAnalyzer:
         recommendations = []
         
         for p in perturbations:
-            if p.perturbation_type == PerturbationType.CASING:
+            if p.perturbation_type is PerturbationType.CASING:
                 recommendations.append("Normalize text casing before processing")
-            elif p.perturbation_type == PerturbationType.TYPOS:
+            elif p.perturbation_type is PerturbationType.TYPOS:
                 recommendations.append("Apply spelling correction and normalize leetspeak")
-            elif p.perturbation_type == PerturbationType.NEGATION:
+            elif p.perturbation_type is PerturbationType.NEGATION:
                 recommendations.append("Carefully parse negation logic - check for double negatives")
-            elif p.perturbation_type == PerturbationType.ENTITY_REPLACEMENT:
+            elif p.perturbation_type is PerturbationType.ENTITY_REPLACEMENT:
                 recommendations.append("Resolve vague entity references to specific names")
-            elif p.perturbation_type == PerturbationType.LLM_REWRITE:
+            elif p.perturbation_type is PerturbationType.LLM_REWRITE:
                 recommendations.append("Extract core claim meaning - text may be AI paraphrased")
-            elif p.perturbation_type == PerturbationType.DIALECT:
+            elif p.perturbation_type is PerturbationType.DIALECT:
                 recommendations.append("Translate dialect to standard English before matching")
         
         recommendations.append("Compare normalized claim against fact-check database")
@@ -621,6 +966,20 @@ class ClaimAnalyzer:
         }
 
 
+@lru_cache(maxsize=1)
+def get_shared_analyzer() -> ClaimAnalyzer:
+    """
+    Shared ClaimAnalyzer for the whole process
+    
+    The pipeline, the integrated analyzer and the mechanistic analyzer all
+    need one; building it once avoids compiling the pattern tables again
+    for each. Its state is read-only after __init__, so it is safe to use
+    from several threads. It is built quietly, since it is usually created
+    inside a service or another component rather than by a person.
+    """
+    return ClaimAnalyzer(verbose=False)
+
+
 # Test when run directly
 if __name__ == "__main__":
     print("\n" + "=" * 50)
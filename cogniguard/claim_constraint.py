@@ -35,6 +35,7 @@ HOW IT WORKS:
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, Dict
 import numpy as np
 
@@ -112,6 +113,10 @@ class ClaimConstraint:
                 print("   ⚠️ Falling back to basic text comparison")
                 self.use_semantic = False
         
+        # The original claim is compared with every one of its perturbations,
+        # so embeddings are cached per text
+        self._embed_cached = lru_cache(maxsize=4096)(self._embed_readonly)
+        
         print("   ✅ Constraint Checker ready!\n")
     
     # =========================================================================
@@ -208,8 +213,8 @@ class ClaimConstraint:
             return self._basic_similarity(text1, text2)
         
         # Get embeddings
-        embedding1 = self.model.encode(text1, convert_to_numpy=True)
-        embedding2 = self.model.encode(text2, convert_to_numpy=True)
+        embedding1 = self.embed(text1)
+        embedding2 = self.embed(text2)
         
         # Calculate cosine similarity
         dot_product = np.dot(embedding1, embedding2)
@@ -221,6 +226,20 @@ class ClaimConstraint:
         # Ensure it's between 0 and 1
         return float(max(0.0, min(1.0, similarity)))
     
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embedding of text (cached, so the array is shared and read-only)
+        
+        Requires the semantic model.
+        """
+        return self._embed_cached(text)
+    
+    def _embed_readonly(self, text: str) -> np.ndarray:
+        """One model pass, locked against writes since callers share it"""
+        embedding = self.model.encode(text, convert_to_numpy=True)
+        embedding.setflags(write=False)
+        return embedding
+    
     def _basic_similarity(self, text1: str, text2: str) -> float:
         """
         Calculate basic similarity without AI
@@ -31,6 +31,7 @@ WHY WE NEED THIS:
 
 from enum import Enum
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Optional, Dict
 import random
 import re
@@ -105,10 +106,16 @@ class ClaimGenerator:
         all_results = generator.generate_all("The vaccine is safe")
     """
     
-    def __init__(self):
-        """Initialize the generator with all transformation rules"""
+    def __init__(self, verbose: bool = True):
+        """
+        Initialize the generator with all transformation rules
         
-        print("🧬 Loading Claim Generator...")
+        Args:
+            verbose: Print the loading banner
+        """
+        
+        if verbose:
+            print("🧬 Loading Claim Generator...")
         
         # ═══════════════════════════════════════════════════════════════
         # LEETSPEAK MAPPINGS (for TYPOS perturbation)
@@ -207,10 +214,11 @@ class ClaimGenerator:
             }
         }
         
-        print("   ✅ Claim Generator ready!")
-        print(f"   📊 Perturbation types: {len(PerturbationType)}")
-        print(f"   📊 Noise budgets: {len(NoiseBudget)}")
-        print()
+        if verbose:
+            print("   ✅ Claim Generator ready!")
+            print(f"   📊 Perturbation types: {len(PerturbationType)}")
+            print(f"   📊 Noise budgets: {len(NoiseBudget)}")
+            print()
     
     # =========================================================================
     # MAIN TRANSFORMATION METHOD
@@ -579,6 +587,18 @@ class ClaimGenerator:
         return dataset
 
 
+@lru_cache(maxsize=1)
+def get_shared_generator() -> ClaimGenerator:
+    """
+    Shared ClaimGenerator for the whole process
+    
+    Its rule tables are read-only after __init__, so one instance can serve
+    the pipeline and the mechanistic generator, from several threads.
+    Like get_shared_analyzer(), it is built quietly.
+    """
+    return ClaimGenerator(verbose=False)
+
+
 # =============================================================================
 # STANDALONE TEST
 # =============================================================================
@@ -10,7 +10,7 @@ import argparse
 import json
 import sys
 
-from .claim_analyzer import ClaimAnalyzer
+from .claim_analyzer import get_shared_analyzer
 from .detection_engine import CogniGuardEngine
 
 
@@ -60,7 +60,7 @@ def run_analysis(args):
     
     # Claims analysis
     if args.mode in ["claims", "both"]:
-        analyzer = ClaimAnalyzer()
+        analyzer = get_shared_analyzer()
         result = analyzer.analyze(text)
         results["claims"] = {
             "is_perturbed": result.is_perturbed,
@@ -25,28 +25,37 @@ ANALOGY:
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
+import math
 import re
-from collections import defaultdict
+import sys
+import time
+from collections import Counter, defaultdict, deque
+from functools import lru_cache
+from itertools import islice
+import numpy as np
+
+from ._compat import SLOTS
 
 
 # =============================================================================
 # DATA CLASSES
 # =============================================================================
 
-@dataclass
+@dataclass(**SLOTS)
 class ConversationMessage:
     """A single message in a conversation"""
     content: str
     role: str                   # "user" or "assistant"
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp: int = field(default_factory=time.time_ns)  # ns since epoch
     threat_level: str = "SAFE"
     threat_type: str = "None"
     signals: List[str] = field(default_factory=list)
+    signal_mask: int = 0        # One bit per signal type (see _signal_bit)
 
 
-@dataclass
+@dataclass(**SLOTS)
 class ConversationPattern:
     """A detected multi-turn attack pattern"""
     pattern_type: str
@@ -59,6 +68,95 @@ class ConversationPattern:
     first_seen: datetime = field(default_factory=datetime.now)
 
 
+# =============================================================================
+# CONVERSATION STORAGE
+# =============================================================================
+
+class ConversationStore:
+    """
+    Message history for one conversation, stored column by column.
+    
+    Each field lives in its own deque, so scans that only need signal
+    masks or roles walk one compact column instead of hopping between
+    message objects. Iterating or indexing still yields ConversationMessage
+    rows for callers that want whole messages.
+    """
+    
+    __slots__ = ("contents", "roles", "timestamps_ns", "threat_levels",
+                 "threat_types", "signals", "signal_masks",
+                 "previews", "evidence")
+    
+    def __init__(self, maxlen: Optional[int] = None):
+        self.contents: deque = deque(maxlen=maxlen)
+        self.roles: deque = deque(maxlen=maxlen)
+        self.timestamps_ns: deque = deque(maxlen=maxlen)
+        self.threat_levels: deque = deque(maxlen=maxlen)
+        self.threat_types: deque = deque(maxlen=maxlen)
+        self.signals: deque = deque(maxlen=maxlen)
+        self.signal_masks: deque = deque(maxlen=maxlen)
+        # Formatted once at insert time rather than on every analysis
+        self.previews: deque = deque(maxlen=maxlen)     # 50-char summary preview
+        self.evidence: deque = deque(maxlen=maxlen)     # evidence line ("" if no signals)
+    
+    @property
+    def maxlen(self) -> Optional[int]:
+        return self.contents.maxlen
+    
+    def __len__(self) -> int:
+        return len(self.contents)
+    
+    def __getitem__(self, index):
+        """One message, or a list of them for a slice (like the old list)"""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step > 0:
+                return list(islice(self, start, stop, step))
+            return list(self)[index]
+        return ConversationMessage(
+            content=self.contents[index],
+            role=self.roles[index],
+            timestamp=self.timestamps_ns[index],
+            threat_level=self.threat_levels[index],
+            threat_type=self.threat_types[index],
+            signals=self.signals[index],
+            signal_mask=self.signal_masks[index]
+        )
+    
+    def __iter__(self):
+        # Walk the columns side by side; indexing a deque by position is
+        # O(n), which would make a full iteration quadratic
+        return map(ConversationMessage, self.contents, self.roles,
+                   self.timestamps_ns, self.threat_levels, self.threat_types,
+                   self.signals, self.signal_masks)
+    
+    def append(self,
+               content: str,
+               role: str,
+               timestamp_ns: int,
+               threat_level: str,
+               threat_type: str,
+               signals: List[str],
+               signal_mask: int):
+        """Append one message (the oldest is dropped when bounded and full)"""
+        self.contents.append(content)
+        self.roles.append(role)
+        self.timestamps_ns.append(timestamp_ns)
+        self.threat_levels.append(threat_level)
+        self.threat_types.append(threat_type)
+        self.signals.append(signals)
+        self.signal_masks.append(signal_mask)
+        self.previews.append(
+            content[:50] + "..." if len(content) > 50 else content
+        )
+        if signal_mask:
+            preview = content[:80] + "..." if len(content) > 80 else content
+            self.evidence.append(
+                f"[{role}] \"{preview}\" → Signals: {', '.join(signals)}"
+            )
+        else:
+            self.evidence.append("")
+
+
 # =============================================================================
 # MAIN CONVERSATION ANALYZER
 # =============================================================================
@@ -81,19 +179,59 @@ class ConversationAnalyzer:
         score = analyzer.get_suspicion_score("conv_123")
     """
     
-    def __init__(self):
-        """Initialize the conversation analyzer"""
+    def __init__(self,
+                 max_history: Optional[int] = None,
+                 suspicion_decay_tau: Optional[float] = None,
+                 decay_interval: float = 60.0):
+        """
+        Initialize the conversation analyzer
+        
+        Args:
+            max_history: How many messages to keep per conversation
+                        (None keeps them all). When set, older messages
+                        are dropped automatically, and with them their
+                        evidence for analyze_conversation.
+            suspicion_decay_tau: Time constant (seconds) for exponential
+                        decay of suspicion scores (e.g. 3600.0). None,
+                        the default, keeps scores as they are.
+            decay_interval: Minimum seconds between decay passes.
+        """
         print("💬 Loading Conversation Analyzer...")
         
-        # Store conversations: {conv_id: [messages]}
-        self.conversations: Dict[str, List[ConversationMessage]] = defaultdict(list)
+        self.max_history = max_history
+        self.suspicion_decay_tau = suspicion_decay_tau
+        self.decay_interval = decay_interval
+        
+        # Store conversations: {conv_id: ConversationStore}
+        # With max_history set, the deques evict the oldest message in O(1)
+        # on append
+        self.conversations: Dict[str, ConversationStore] = defaultdict(
+            lambda: ConversationStore(self.max_history)
+        )
+        
+        # Running signal counts over the retained history: {conv_id: Counter}
+        # Kept in step with the deque so analysis never rescans messages
+        self._conv_signal_counts: Dict[str, Counter] = defaultdict(Counter)
+        
+        # Union of signal bits over the retained history: {conv_id: int}
+        self._conv_masks: Dict[str, int] = defaultdict(int)
         
-        # Suspicion scores: {conv_id: float}
-        self.suspicion_scores: Dict[str, float] = defaultdict(float)
+        # Suspicion scores live in one contiguous float64 array, one slot per
+        # conversation, so bulk queries are a single vectorized comparison.
+        # float64 sums the weights exactly as Python floats do, so a score
+        # lands on a risk threshold like 0.8 instead of just under it
+        self._conv_index: Dict[str, int] = {}       # conv_id -> slot
+        self._slot_conv_ids: List[Optional[str]] = []  # slot -> conv_id
+        self._free_slots: List[int] = []
+        self._scores = np.zeros(1024, dtype=np.float64)
+        self._last_decay_ns = time.monotonic_ns()
         
         # Signal definitions
         self._setup_signals()
         
+        # Greetings and templated messages repeat a lot; remember their scans
+        self._scan_signals_cached = lru_cache(maxsize=4096)(self._scan_signals)
+        
         # Pattern definitions
         self._setup_patterns()
         
@@ -266,6 +404,34 @@ class ConversationAnalyzer:
                 "category": "escalation"
             },
         }
+        
+        # Flatten the definitions into parallel tuples indexed by signal id,
+        # so the per-message hot path indexes tuples instead of hashing dicts.
+        # Names are interned so the signal lists handed out by add_message
+        # compare by identity in set/Counter operations.
+        self._signal_names = tuple(sys.intern(name) for name in self.signal_patterns)
+        self._signal_weights = tuple(
+            signal_def["weight"] for signal_def in self.signal_patterns.values()
+        )
+        # Each signal's patterns are fused into one alternation, so a
+        # message costs one regex search per signal type
+        self._signal_regexes = tuple(
+            self._compile_alternation(signal_def["patterns"])
+            for signal_def in self.signal_patterns.values()
+        )
+        
+        # Each signal gets one bit (1 << signal id), so a message's signals
+        # fit in one int and pattern checks become bitwise ANDs
+        self._signal_bit = {
+            name: 1 << i for i, name in enumerate(self._signal_names)
+        }
+        self._signal_category = {
+            name: self.signal_patterns[name]["category"]
+            for name in self._signal_names
+        }
+        self._category_mask: Dict[str, int] = defaultdict(int)
+        for name, category in self._signal_category.items():
+            self._category_mask[category] |= self._signal_bit[name]
     
     def _setup_patterns(self):
         """Define multi-turn attack patterns"""
@@ -331,6 +497,26 @@ class ConversationAnalyzer:
                 "recommendation": "Coordinated data extraction attempt detected. Review what information has already been shared in this conversation."
             },
         }
+        
+        # Precompute the signal masks each pattern needs: one mask per
+        # required category (all must be hit) and their union
+        for pattern_def in self.pattern_definitions.values():
+            category_masks = tuple(
+                self._category_mask[cat]
+                for cat in pattern_def.get("required_signals", [])
+            )
+            required_mask = 0
+            for mask in category_masks:
+                required_mask |= mask
+            pattern_def["_category_masks"] = category_masks
+            pattern_def["_required_mask"] = required_mask
+            pattern_def["_min_signals"] = pattern_def.get("min_signal_count", 1)
+        
+        # Union over all patterns: a conversation with none of these bits
+        # set cannot match anything
+        self._any_required_mask = 0
+        for pattern_def in self.pattern_definitions.values():
+            self._any_required_mask |= pattern_def["_required_mask"]
     
     # =========================================================================
     # MAIN METHODS
@@ -357,26 +543,56 @@ class ConversationAnalyzer:
         """
         
         # Detect signals in this message
-        signals = self._detect_signals(message)
-        
-        # Create message object
-        msg = ConversationMessage(
-            content=message,
-            role=role,
-            timestamp=datetime.now(),
-            threat_level=threat_level,
-            threat_type=threat_type,
-            signals=signals
-        )
+        signal_mask, score_delta = self._detect_signals(message)
+        signals = self._signals_from_mask(signal_mask)
         
         # Add to conversation
-        self.conversations[conversation_id].append(msg)
+        self._append_message(conversation_id, message, role, signals,
+                             signal_mask, threat_level, threat_type)
         
-        # Update suspicion score
-        self._update_suspicion(conversation_id, signals)
+        # Update suspicion score (weights were summed during detection)
+        self._maybe_decay()
+        slot = self._score_slot(conversation_id)  # may grow self._scores
+        self._scores[slot] += score_delta
         
         return signals
     
+    def add_messages(self,
+                     conversation_id: str,
+                     messages: List[str],
+                     role: str = "user") -> List[List[str]]:
+        """
+        Add several messages to a conversation in one call.
+        
+        Useful for offline analysis of recorded conversations: all
+        messages are scanned first and the suspicion score is updated
+        once for the whole batch.
+        
+        Args:
+            conversation_id: Unique conversation identifier
+            messages: The message texts, oldest first
+            role: "user" or "assistant" (applies to every message)
+            
+        Returns:
+            List of signal names detected, one list per message
+        """
+        
+        detections = [self._detect_signals(message) for message in messages]
+        
+        all_signals = []
+        batch_delta = 0.0
+        for message, (signal_mask, score_delta) in zip(messages, detections):
+            signals = self._signals_from_mask(signal_mask)
+            self._append_message(conversation_id, message, role, signals, signal_mask)
+            all_signals.append(signals)
+            batch_delta += score_delta
+        
+        self._maybe_decay()
+        slot = self._score_slot(conversation_id)  # may grow self._scores
+        self._scores[slot] += batch_delta
+        
+        return all_signals
+    
     def analyze_conversation(self, conversation_id: str) -> List[ConversationPattern]:
         """
         Analyze a conversation for multi-turn attack patterns.
@@ -396,19 +612,14 @@ class ConversationAnalyzer:
         if len(messages) < 2:
             return []
         
-        detected_patterns = []
+        # Fast path: no signal any pattern cares about
+        conv_mask = self._conv_masks.get(conversation_id, 0)
+        if not conv_mask & self._any_required_mask:
+            return []
         
-        # Collect all signals from all messages
-        all_signals = []
-        signal_categories = defaultdict(int)
+        detected_patterns = []
         
-        for msg in messages:
-            for signal in msg.signals:
-                all_signals.append(signal)
-                # Get the category for this signal
-                for signal_name, signal_def in self.signal_patterns.items():
-                    if signal == signal_name:
-                        signal_categories[signal_def["category"]] += 1
+        signal_counts = self._conv_signal_counts[conversation_id]
         
         # Check each pattern definition
         for pattern_name, pattern_def in self.pattern_definitions.items():
@@ -418,24 +629,18 @@ class ConversationAnalyzer:
             if len(messages) < min_messages:
                 continue
             
-            # Check required signal categories
-            required = pattern_def.get("required_signals", [])
-            has_required = all(
-                signal_categories.get(cat, 0) > 0 
-                for cat in required
-            )
-            
-            if not has_required:
+            # Every required category must have at least one signal bit set
+            if not all(conv_mask & mask for mask in pattern_def["_category_masks"]):
                 continue
             
             # Check minimum signal count (if specified)
-            min_count = pattern_def.get("min_signal_count", 1)
+            required_mask = pattern_def["_required_mask"]
             total_relevant_signals = sum(
-                signal_categories.get(cat, 0) 
-                for cat in required
+                count for signal, count in signal_counts.items()
+                if self._signal_bit[signal] & required_mask
             )
             
-            if total_relevant_signals < min_count:
+            if total_relevant_signals < pattern_def["_min_signals"]:
                 continue
             
             # Pattern detected! Calculate confidence
@@ -449,14 +654,14 @@ class ConversationAnalyzer:
             
             confidence = min(base_confidence + signal_boost + message_boost, 0.99)
             
-            # Collect evidence
-            evidence = []
-            for msg in messages:
-                if msg.signals:
-                    preview = msg.content[:80] + "..." if len(msg.content) > 80 else msg.content
-                    evidence.append(
-                        f"[{msg.role}] \"{preview}\" → Signals: {', '.join(msg.signals)}"
-                    )
+            # Collect evidence: only messages carrying a signal this pattern
+            # needs (lines were formatted when each message arrived). The
+            # scan stops at the 10th line instead of walking the whole history
+            evidence = list(islice((
+                line for signal_mask, line
+                in zip(messages.signal_masks, messages.evidence)
+                if signal_mask & required_mask
+            ), 10))
             
             detected_patterns.append(ConversationPattern(
                 pattern_type=pattern_name,
@@ -464,13 +669,56 @@ class ConversationAnalyzer:
                 risk_level=pattern_def["risk_level"],
                 description=pattern_def["description"],
                 recommendation=pattern_def["recommendation"],
-                evidence=evidence[:10],  # Limit to 10 evidence items
+                evidence=evidence,  # At most 10 evidence items
                 messages_involved=len(messages),
-                first_seen=messages[0].timestamp
+                first_seen=datetime.fromtimestamp(messages.timestamps_ns[0] / 1e9)
             ))
         
         return detected_patterns
     
+    def analyze_all(self) -> Dict[str, List[ConversationPattern]]:
+        """
+        Analyze every tracked conversation for multi-turn attack patterns.
+        
+        The cheap structural checks (message count and required signal
+        categories) run as vectorized NumPy operations over all
+        conversation masks at once; only conversations that pass them go
+        through the full analyze_conversation.
+        
+        Returns:
+            {conversation_id: [ConversationPattern, ...]} for conversations
+            with at least one detected pattern
+        """
+        conv_ids = list(self.conversations)
+        if not conv_ids:
+            return {}
+        
+        masks = np.fromiter(
+            (self._conv_masks.get(conv_id, 0) for conv_id in conv_ids),
+            dtype=np.uint64, count=len(conv_ids)
+        )
+        lengths = np.fromiter(
+            (len(self.conversations[conv_id]) for conv_id in conv_ids),
+            dtype=np.int64, count=len(conv_ids)
+        )
+        
+        # One vectorized pass per pattern over all conversations
+        candidates = np.zeros(len(conv_ids), dtype=bool)
+        for pattern_def in self.pattern_definitions.values():
+            hit = lengths >= max(pattern_def.get("min_messages", 2), 2)
+            for category_mask in pattern_def["_category_masks"]:
+                hit &= (masks & np.uint64(category_mask)) != 0
+            candidates |= hit
+        
+        results = {}
+        for index in np.flatnonzero(candidates):
+            conv_id = conv_ids[index]
+            patterns = self.analyze_conversation(conv_id)
+            if patterns:
+                results[conv_id] = patterns
+        
+        return results
+    
     def get_suspicion_score(self, conversation_id: str) -> float:
         """
         Get the current suspicion score for a conversation.
@@ -478,73 +726,214 @@ class ConversationAnalyzer:
         Returns:
             Float from 0.0 (safe) to 1.0 (highly suspicious)
         """
-        return min(self.suspicion_scores.get(conversation_id, 0.0), 1.0)
+        self._maybe_decay()
+        slot = self._conv_index.get(conversation_id)
+        if slot is None:
+            return 0.0
+        return min(float(self._scores[slot]), 1.0)
+    
+    @property
+    def suspicion_scores(self) -> Dict[str, float]:
+        """Raw (uncapped) suspicion score per conversation"""
+        self._maybe_decay()
+        return {
+            conv_id: float(self._scores[slot])
+            for conv_id, slot in self._conv_index.items()
+        }
+    
+    def get_suspicious_conversations(self, threshold: float = 0.5) -> List[str]:
+        """
+        Get every conversation whose suspicion score is at or above threshold.
+        
+        Args:
+            threshold: Minimum score (0.5 = "HIGH" risk and above)
+            
+        Returns:
+            List of conversation IDs
+        """
+        self._maybe_decay()
+        used = len(self._slot_conv_ids)
+        slots = np.flatnonzero(self._scores[:used] >= threshold)
+        return [
+            self._slot_conv_ids[slot] for slot in slots
+            if self._slot_conv_ids[slot] is not None
+        ]
     
     def get_conversation_summary(self, conversation_id: str) -> Dict:
         """
         Get a summary of a conversation's security status.
         """
-        messages = self.conversations.get(conversation_id, [])
+        messages = self.conversations.get(conversation_id)
+        if messages is None:
+            messages = ConversationStore(self.max_history)
         patterns = self.analyze_conversation(conversation_id)
         suspicion = self.get_suspicion_score(conversation_id)
         
-        # Collect all signals
-        all_signals = []
-        for msg in messages:
-            all_signals.extend(msg.signals)
+        # Signals still present in the retained history
+        signal_counts = +self._conv_signal_counts.get(conversation_id, Counter())
+        
+        # Last 10 messages: walk the columns from the newest end so only
+        # those rows are touched, then put them back in order
+        recent = list(islice(zip(
+            reversed(messages.roles), reversed(messages.previews),
+            reversed(messages.signals), reversed(messages.timestamps_ns)
+        ), 10))
+        recent.reverse()
         
         return {
             "conversation_id": conversation_id,
             "message_count": len(messages),
             "suspicion_score": suspicion,
             "patterns": patterns,
-            "signals_detected": list(set(all_signals)),
-            "signal_count": len(all_signals),
+            "signals_detected": list(signal_counts),
+            "signal_count": sum(signal_counts.values()),
             "risk_level": self._score_to_risk(suspicion),
             "messages": [
                 {
-                    "role": m.role,
-                    "preview": m.content[:50] + "..." if len(m.content) > 50 else m.content,
-                    "signals": m.signals,
-                    "timestamp": m.timestamp.isoformat()
+                    "role": role,
+                    "preview": preview,
+                    "signals": signals,
+                    "timestamp": datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
                 }
-                for m in messages[-10:]  # Last 10 messages
+                for role, preview, signals, timestamp_ns in recent
             ]
         }
     
+    def decay_scores(self):
+        """
+        Apply exponential decay to every suspicion score.
+        
+        Scores shrink by exp(-elapsed / suspicion_decay_tau) since the last
+        pass, so a conversation that goes quiet drifts back towards SAFE
+        instead of staying flagged forever. Runs as one vectorized multiply
+        over the score array.
+        """
+        now = time.monotonic_ns()
+        elapsed = (now - self._last_decay_ns) / 1e9
+        self._last_decay_ns = now
+        
+        if not self.suspicion_decay_tau or elapsed <= 0:
+            return
+        
+        used = len(self._slot_conv_ids)
+        self._scores[:used] *= math.exp(-elapsed / self.suspicion_decay_tau)
+    
     def clear_conversation(self, conversation_id: str):
         """Clear a conversation's history"""
         if conversation_id in self.conversations:
             del self.conversations[conversation_id]
-        if conversation_id in self.suspicion_scores:
-            del self.suspicion_scores[conversation_id]
+        if conversation_id in self._conv_signal_counts:
+            del self._conv_signal_counts[conversation_id]
+        if conversation_id in self._conv_masks:
+            del self._conv_masks[conversation_id]
+        slot = self._conv_index.pop(conversation_id, None)
+        if slot is not None:
+            self._scores[slot] = 0.0
+            self._slot_conv_ids[slot] = None
+            self._free_slots.append(slot)
     
     # =========================================================================
     # INTERNAL METHODS
     # =========================================================================
     
-    def _detect_signals(self, message: str) -> List[str]:
-        """Detect signals in a single message"""
-        detected = []
-        message_lower = message.lower()
-        
-        for signal_name, signal_def in self.signal_patterns.items():
-            for pattern in signal_def["patterns"]:
-                try:
-                    if re.search(pattern, message_lower):
-                        detected.append(signal_name)
-                        break  # One match per signal type is enough
-                except re.error:
-                    continue
-        
-        return detected
-    
-    def _update_suspicion(self, conversation_id: str, signals: List[str]):
-        """Update suspicion score based on new signals"""
-        for signal_name in signals:
-            if signal_name in self.signal_patterns:
-                weight = self.signal_patterns[signal_name]["weight"]
-                self.suspicion_scores[conversation_id] += weight
+    def _maybe_decay(self):
+        """
+        Run decay_scores at most once every decay_interval seconds
+        
+        Called before scores are read as well as when they change, so a
+        read on an idle analyzer sees the same decayed value it would after
+        unrelated traffic.
+        """
+        if not self.suspicion_decay_tau:
+            return
+        if time.monotonic_ns() - self._last_decay_ns >= self.decay_interval * 1e9:
+            self.decay_scores()
+    
+    def _score_slot(self, conversation_id: str) -> int:
+        """Get (or assign) a conversation's slot in the score array"""
+        slot = self._conv_index.get(conversation_id)
+        if slot is not None:
+            return slot
+        
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_conv_ids[slot] = conversation_id
+        else:
+            slot = len(self._slot_conv_ids)
+            self._slot_conv_ids.append(conversation_id)
+            if slot >= len(self._scores):
+                # Grow by doubling
+                grown = np.zeros(len(self._scores) * 2, dtype=np.float64)
+                grown[:len(self._scores)] = self._scores
+                self._scores = grown
+        
+        self._conv_index[conversation_id] = slot
+        return slot
+    
+    def _append_message(self,
+                        conversation_id: str,
+                        message: str,
+                        role: str,
+                        signals: List[str],
+                        signal_mask: int,
+                        threat_level: str = "SAFE",
+                        threat_type: str = "None"):
+        """Append a message, keeping signal counts and mask in step"""
+        # The store drops the oldest message when full
+        history = self.conversations[conversation_id]
+        counts = self._conv_signal_counts[conversation_id]
+        conv_mask = self._conv_masks[conversation_id]
+        if len(history) == history.maxlen:
+            evicted_signals = history.signals[0]
+            counts.subtract(evicted_signals)
+            for signal in evicted_signals:
+                if counts[signal] <= 0:
+                    conv_mask &= ~self._signal_bit[signal]
+        history.append(message, role, time.time_ns(), threat_level,
+                       threat_type, signals, signal_mask)
+        counts.update(signals)
+        self._conv_masks[conversation_id] = conv_mask | signal_mask
+    
+    def _detect_signals(self, message: str) -> Tuple[int, float]:
+        """
+        Detect signals in a single message.
+        
+        Returns:
+            (bitmask of detected signals, sum of their suspicion weights)
+        """
+        return self._scan_signals_cached(message.lower())
+    
+    def _scan_signals(self, message_lower: str) -> Tuple[int, float]:
+        """Run every signal regex over an already-lowercased message"""
+        detected = 0
+        score_delta = 0.0
+        
+        for signal_id, regex in enumerate(self._signal_regexes):
+            if regex.search(message_lower):
+                detected |= 1 << signal_id
+                score_delta += self._signal_weights[signal_id]
+        
+        return detected, score_delta
+    
+    def _signals_from_mask(self, mask: int) -> List[str]:
+        """Expand a signal bitmask back into signal names"""
+        return [
+            name for signal_id, name in enumerate(self._signal_names)
+            if mask >> signal_id & 1
+        ]
+    
+    @staticmethod
+    def _compile_alternation(patterns: List[str]) -> "re.Pattern":
+        """Compile patterns into one alternation, skipping any that are invalid"""
+        valid = []
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+            except re.error:
+                continue
+            valid.append(f"(?:{pattern})")
+        # An empty alternation must never match
+        return re.compile("|".join(valid) if valid else r"(?!)")
     
     def _score_to_risk(self, score: float) -> str:
         """Convert suspicion score to risk level"""
@@ -564,10 +953,7 @@ class ConversationAnalyzer:
         return {
             "active_conversations": len(self.conversations),
             "total_messages": sum(len(msgs) for msgs in self.conversations.values()),
-            "conversations_with_patterns": sum(
-                1 for conv_id in self.conversations
-                if self.analyze_conversation(conv_id)
-            )
+            "conversations_with_patterns": len(self.analyze_all())
         }
 
 
@@ -20,10 +20,38 @@ Version: 2.0 Professional
 """
 
 from enum import Enum
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import re
+import threading
+
+from ._compat import SLOTS, collect_hyperscan_id, thread_scratch
+
+# Optional: Aho-Corasick automaton for single-pass keyword matching
+# (pip install pyahocorasick). Falls back to plain substring checks.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional: Hyperscan scans a message once for every keyword and data-leak
+# regex together (pip install hyperscan). Falls back to the above.
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+# Keyword category indices, in the order _analyze checks them
+(_DATA_LEAK, _INJECTION, _SOCIAL_ENGINEERING,
+ _GOAL_HIJACK, _PRIVILEGE, _COLLUSION) = range(6)
+
+
+# ASCII characters Python's \s matches but Hyperscan's doesn't (the
+# information separators), so a Hyperscan "no match" can't be trusted
+_RE_ONLY_SPACES = re.compile(r'[\x1c-\x1f]')
 
 
 # =============================================================================
@@ -51,7 +79,7 @@ class ThreatLevel(Enum):
 # DETECTION RESULT DATACLASS
 # =============================================================================
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class DetectionResult:
     """
     Complete result of threat analysis
@@ -109,6 +137,28 @@ class CogniGuardEngine:
         self._init_privilege_escalation_patterns()
         self._init_collusion_patterns()
         
+        # Keyword lists indexed by category (see _DATA_LEAK etc.)
+        self._keyword_lists = (
+            self.data_leak_keywords,
+            self.injection_keywords,
+            self.social_engineering_keywords,
+            self.goal_hijack_keywords,
+            self.privilege_keywords,
+            self.collusion_keywords,
+        )
+        # (lowercase, original) pairs so matching never re-lowers a keyword
+        self._keyword_pairs = tuple(
+            tuple((keyword.lower(), keyword) for keyword in keywords)
+            for keywords in self._keyword_lists
+        )
+        self._keyword_automaton = self._build_keyword_automaton()
+        self._hyperscan_db = self._build_hyperscan_database()
+        self._hyperscan_local = threading.local()
+        
+        # Repeated messages (common in chatbot traffic) skip the analysis.
+        # Per instance, so the cache doesn't keep the engine alive.
+        self._analyze_cached = lru_cache(maxsize=4096)(self._analyze)
+        
         # Statistics tracking
         self.stats = {
             'total_analyzed': 0,
@@ -249,8 +299,24 @@ class CogniGuardEngine:
             (r'\b\d{3}[-\s]?\d{3}[-\s]?\d{4}\b', 'Phone Number'),
             
             # Generic API Key Pattern
-            (r'["\']?[a-zA-Z_]*(?:api|key|token|secret|password|pwd|pass)[a-zA-Z_]*["\']?\s*[=:]\s*["\']?[a-zA-Z0-9\-_]{16,}["\']?', 'Generic API Key'),
+            # A name containing one of the keywords, then = or : and the
+            # value. The lookbehind only lets a match start at the beginning
+            # of a word (or at a quote), and the lookahead finds the keyword
+            # without splitting the name into two backtracking [a-zA-Z_]*
+            # runs. Either of those alone is quadratic in word length.
+            # Matches are identical to the plain
+            # ["']?[a-zA-Z_]*(?:api|...)[a-zA-Z_]*... form.
+            (r'(?:["\']|(?<![a-zA-Z_]))(?=[a-zA-Z_]*?(?:api|key|token|secret|password|pwd|pass))[a-zA-Z_]+["\']?\s*[=:]\s*["\']?[a-zA-Z0-9\-_]{16,}["\']?', 'Generic API Key'),
         ]
+        
+        # Compile once here instead of on every message
+        self._data_leak_regex_compiled = self._compile_regex(self.data_leak_regex)
+        
+        # All patterns as one alternation: a single search tells us whether
+        # any pattern matches, so clean messages skip the per-pattern loop
+        self._data_leak_regex_any = self._compile_pattern(
+            "|".join(f"(?:{pattern})" for pattern, _ in self.data_leak_regex)
+        )
     
     def _init_prompt_injection_patterns(self):
         """Initialize prompt injection detection patterns"""
@@ -738,7 +804,7 @@ class CogniGuardEngine:
             DetectionResult with complete threat analysis
         """
         self.stats['total_analyzed'] += 1
-        result = self._analyze(message)
+        result = self._copy_result(self._analyze_cached(message))
         
         # Update statistics
         self.stats['by_level'][result.threat_level.name] += 1
@@ -749,6 +815,29 @@ class CogniGuardEngine:
         
         return result
     
+    def detect_many(self, messages: List[str], sender_context: Optional[Dict] = None,
+                    receiver_context: Optional[Dict] = None) -> List[DetectionResult]:
+        """
+        Analyze a batch of messages (log replay, evaluation runs)
+        
+        Same results and statistics as calling detect() on each message in
+        order. Runs sequentially: the regex engine holds the GIL, so worker
+        threads would only add overhead. Repeated messages in a batch are
+        served from the result cache.
+        
+        Args:
+            messages: Texts to analyze
+            sender_context: Sender info shared by every message
+            receiver_context: Receiver info shared by every message
+        
+        Returns:
+            One DetectionResult per message, in input order
+        """
+        sender_context = sender_context if sender_context is not None else {}
+        receiver_context = receiver_context if receiver_context is not None else {}
+        return [self.detect(message, sender_context, receiver_context)
+                for message in messages]
+    
     def detect_demo(self, message: str, sender_context: Dict,
                     receiver_context: Dict) -> DetectionResult:
         """
@@ -778,25 +867,206 @@ class CogniGuardEngine:
                 return keyword
         return None
     
-    def _check_regex(self, text: str, patterns: List[Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+    @staticmethod
+    def _copy_result(result: DetectionResult) -> DetectionResult:
+        """Fresh copy of a cached result, so callers can't mutate the cache"""
+        return replace(
+            result,
+            recommendations=list(result.recommendations),
+            stage_results=dict(result.stage_results) if result.stage_results is not None else None,
+            timestamp=datetime.now()
+        )
+    
+    def _first_keyword(self, text_lower: str, category: int) -> Optional[str]:
+        """_check_keywords for one category's list, on already-lowered text"""
+        for keyword_lower, keyword in self._keyword_pairs[category]:
+            if keyword_lower in text_lower:
+                return keyword
+        return None
+    
+    def _build_keyword_automaton(self):
+        """
+        Build one Aho-Corasick automaton over every keyword list
+        
+        Each keyword maps to the (category, position) entries it appears
+        at, so one pass over a message finds the hits for all categories.
+        
+        Returns:
+            The automaton, or None if pyahocorasick is not installed
+        """
+        if ahocorasick is None:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for category, pairs in enumerate(self._keyword_pairs):
+            for position, (key, keyword) in enumerate(pairs):
+                entries = automaton.get(key, ())
+                automaton.add_word(key, entries + ((category, position, keyword),))
+        automaton.make_automaton()
+        return automaton
+    
+    def _scan_keywords(self, text_lower: str) -> Optional[List[Optional[str]]]:
+        """
+        Find the matched keyword for every category in one pass
+        
+        Args:
+            text_lower: Lowercased text to search in
+        
+        Returns:
+            List indexed by category holding the first-listed keyword found
+            in text (same answer as _check_keywords), or None if the
+            automaton is unavailable
+        """
+        if self._keyword_automaton is None:
+            return None
+        
+        best = [None] * len(self._keyword_lists)
+        for _, entries in self._keyword_automaton.iter(text_lower):
+            for category, position, keyword in entries:
+                if best[category] is None or position < best[category][0]:
+                    best[category] = (position, keyword)
+        return [hit[1] if hit else None for hit in best]
+    
+    def _build_hyperscan_database(self):
+        """
+        Build one Hyperscan database over the data-leak regexes and keywords
+        
+        Pattern IDs below len(data_leak_regex) are regexes, compiled in
+        prefilter mode (a match means "might match", so lookbehind and the
+        like are approximated rather than rejected). The remaining IDs are
+        keywords, matched as literal bytes of their lowercase form, and
+        self._hyperscan_keywords maps them back to (category, position,
+        keyword).
+        
+        Returns:
+            The database, or None if hyperscan is not installed or the
+            patterns fail to compile
+        """
+        self._hyperscan_keywords = []
+        if hyperscan is None:
+            return None
+        
+        expressions = [pattern.encode() for pattern, _ in self.data_leak_regex]
+        flags = [hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_PREFILTER |
+                 hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions)
+        for category, pairs in enumerate(self._keyword_pairs):
+            for position, (keyword_lower, keyword) in enumerate(pairs):
+                literal = keyword_lower.encode('utf-8')
+                expressions.append(''.join(f'\\x{byte:02x}' for byte in literal).encode())
+                flags.append(hyperscan.HS_FLAG_SINGLEMATCH)
+                self._hyperscan_keywords.append((category, position, keyword))
+        
+        database = hyperscan.Database()
+        try:
+            database.compile(expressions=expressions, ids=list(range(len(expressions))),
+                             elements=len(expressions), flags=flags)
+        except hyperscan.error:
+            self._hyperscan_keywords = []
+            return None
+        return database
+    
+    def _hyperscan_scan(self, text: str,
+                        text_lower: str) -> Optional[Tuple[bool, List[Optional[str]]]]:
         """
-        Check if any regex pattern matches (with error handling)
+        Scan text once for the data-leak regexes and every keyword category
         
         Args:
             text: Text to search in
-            patterns: List of (regex_pattern, pattern_name) tuples
+            text_lower: text.lower(), which is what actually gets scanned
+        
+        Returns:
+            (regex_may_match, keyword_hits), or None if Hyperscan is
+            unavailable. regex_may_match is only trusted for ASCII text
+            (Hyperscan's caseless/class matching is byte-wise) that has
+            none of the separator characters only re treats as whitespace;
+            for other text it is None and the caller falls back to the
+            regex gate.
+            keyword_hits has the same meaning as _scan_keywords' result.
+        """
+        if self._hyperscan_db is None:
+            return None
+        
+        matched_ids = []
+        self._hyperscan_db.scan(text_lower.encode('utf-8', 'surrogatepass'),
+                                match_event_handler=collect_hyperscan_id,
+                                context=matched_ids,
+                                scratch=thread_scratch(self._hyperscan_db, self._hyperscan_local))
+        
+        regex_count = len(self.data_leak_regex)
+        regex_may_match = False
+        best = [None] * len(self._keyword_lists)
+        for pattern_id in matched_ids:
+            if pattern_id < regex_count:
+                regex_may_match = True
+                continue
+            category, position, keyword = self._hyperscan_keywords[pattern_id - regex_count]
+            if best[category] is None or position < best[category][0]:
+                best[category] = (position, keyword)
+        if not text.isascii() or _RE_ONLY_SPACES.search(text):
+            regex_may_match = None
+        return regex_may_match, [hit[1] if hit else None for hit in best]
+    
+    def _match_category(self, text_lower: str, category: int,
+                        keyword_hits: Optional[List[Optional[str]]]) -> Optional[str]:
+        """Matched keyword for one category, from the shared scan if we have it"""
+        if keyword_hits is not None:
+            return keyword_hits[category]
+        return self._first_keyword(text_lower, category)
+    
+    def _compile_pattern(self, pattern: str):
+        """
+        Compile one case-insensitive regex with the standard library
+        
+        Not RE2: its whitespace, digit and word-boundary classes are
+        ASCII-only, so a phone or card number split by a no-break space or
+        vertical tab, or written in non-ASCII digits, would slip past the
+        data-leak rules and the verdict would depend on which packages are
+        installed. The Generic API Key pattern's lookbehind is what keeps
+        re from backtracking quadratically instead.
+        
+        Returns:
+            Compiled pattern, or None if invalid
+        """
+        try:
+            return re.compile(pattern, re.IGNORECASE)
+        except re.error:
+            return None
+    
+    def _compile_regex(self, patterns: List[Tuple[str, str]]) -> List[Tuple["re.Pattern", str]]:
+        """
+        Compile (regex_pattern, pattern_name) tuples (case-insensitive)
+        
+        Invalid patterns are skipped so one bad entry can't break detection.
+        """
+        compiled = []
+        for pattern, name in patterns:
+            regex = self._compile_pattern(pattern)
+            if regex is not None:
+                compiled.append((regex, name))
+        return compiled
+    
+    def _check_regex(self, text: str, patterns: List[Tuple["re.Pattern", str]],
+                     any_regex: Optional["re.Pattern"] = None) -> Optional[Tuple[str, str]]:
+        """
+        Check if any regex pattern matches
+        
+        Args:
+            text: Text to search in
+            patterns: List of (compiled_pattern, pattern_name) tuples
+            any_regex: Optional alternation of all patterns; if it doesn't
+                       match, the per-pattern loop is skipped
             
         Returns:
             Tuple of (matched_text, pattern_name) or None
         """
-        for pattern, name in patterns:
-            try:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    return (match.group(), name)
-            except re.error:
-                # Skip invalid regex patterns
-                continue
+        if any_regex is not None and not any_regex.search(text):
+            return None
+        
+        # Report the first-listed pattern that matches
+        for regex, name in patterns:
+            match = regex.search(text)
+            if match:
+                return (match.group(), name)
         return None
     
     # =========================================================================
@@ -820,8 +1090,19 @@ class CogniGuardEngine:
         # CHECK 1: DATA EXFILTRATION (CRITICAL)
         # =====================================================================
         
+        # One Hyperscan pass covers the regex gate and every keyword category
+        message_lower = message.lower()
+        scan = self._hyperscan_scan(message, message_lower)
+        regex_may_match, keyword_hits = scan if scan is not None else (None, None)
+        
         # First check regex patterns (catches specific formats like API keys)
-        regex_match = self._check_regex(message, self.data_leak_regex)
+        if regex_may_match is None:
+            regex_match = self._check_regex(message, self._data_leak_regex_compiled,
+                                           self._data_leak_regex_any)
+        elif regex_may_match:
+            regex_match = self._check_regex(message, self._data_leak_regex_compiled)
+        else:
+            regex_match = None
         if regex_match:
             matched_text, pattern_name = regex_match
             # Truncate matched text for display (don't show full secrets)
@@ -845,8 +1126,12 @@ class CogniGuardEngine:
                 }
             )
         
+        # One pass over the message for every keyword category
+        if keyword_hits is None:
+            keyword_hits = self._scan_keywords(message_lower)
+        
         # Then check keywords (catches general patterns)
-        keyword_match = self._check_keywords(message, self.data_leak_keywords)
+        keyword_match = self._match_category(message_lower, _DATA_LEAK, keyword_hits)
         if keyword_match:
             return DetectionResult(
                 threat_level=ThreatLevel.CRITICAL,
@@ -871,7 +1156,7 @@ class CogniGuardEngine:
         # CHECK 2: PROMPT INJECTION (CRITICAL)
         # =====================================================================
         
-        keyword_match = self._check_keywords(message, self.injection_keywords)
+        keyword_match = self._match_category(message_lower, _INJECTION, keyword_hits)
         if keyword_match:
             return DetectionResult(
                 threat_level=ThreatLevel.CRITICAL,
@@ -896,7 +1181,7 @@ class CogniGuardEngine:
         # CHECK 3: SOCIAL ENGINEERING (HIGH)
         # =====================================================================
         
-        keyword_match = self._check_keywords(message, self.social_engineering_keywords)
+        keyword_match = self._match_category(message_lower, _SOCIAL_ENGINEERING, keyword_hits)
         if keyword_match:
             return DetectionResult(
                 threat_level=ThreatLevel.HIGH,
@@ -921,7 +1206,7 @@ class CogniGuardEngine:
         # CHECK 4: GOAL HIJACKING (HIGH)
         # =====================================================================
         
-        keyword_match = self._check_keywords(message, self.goal_hijack_keywords)
+        keyword_match = self._match_category(message_lower, _GOAL_HIJACK, keyword_hits)
         if keyword_match:
             return DetectionResult(
                 threat_level=ThreatLevel.HIGH,
@@ -946,7 +1231,7 @@ class CogniGuardEngine:
         # CHECK 5: PRIVILEGE ESCALATION (HIGH)
         # =====================================================================
         
-        keyword_match = self._check_keywords(message, self.privilege_keywords)
+        keyword_match = self._match_category(message_lower, _PRIVILEGE, keyword_hits)
         if keyword_match:
             return DetectionResult(
                 threat_level=ThreatLevel.HIGH,
@@ -971,7 +1256,7 @@ class CogniGuardEngine:
         # CHECK 6: EMERGENT COLLUSION (HIGH)
         # =====================================================================
         
-        keyword_match = self._check_keywords(message, self.collusion_keywords)
+        keyword_match = self._match_category(message_lower, _COLLUSION, keyword_hits)
         if keyword_match:
             return DetectionResult(
                 threat_level=ThreatLevel.HIGH,
@@ -1045,7 +1330,7 @@ class CogniGuardEngine:
         Returns:
             Dictionary with injection analysis
         """
-        keyword_match = self._check_keywords(text, self.injection_keywords)
+        keyword_match = self._first_keyword(text.lower(), _INJECTION)
         is_injection = keyword_match is not None
         
         return {
@@ -1067,9 +1352,13 @@ class CogniGuardEngine:
         Returns:
             Dictionary with data leak analysis
         """
-        # Check both regex and keywords
-        regex_match = self._check_regex(text, self.data_leak_regex)
-        keyword_match = self._check_keywords(text, self.data_leak_keywords)
+        # Regex first; a regex hit decides the leak type, so the keyword
+        # scan is only needed when no regex matched
+        regex_match = self._check_regex(text, self._data_leak_regex_compiled,
+                                       self._data_leak_regex_any)
+        keyword_match = None
+        if regex_match is None:
+            keyword_match = self._first_keyword(text.lower(), _DATA_LEAK)
         
         has_leak = regex_match is not None or keyword_match is not None
         leak_type = None
@@ -1089,7 +1378,14 @@ class CogniGuardEngine:
     
     def get_stats(self) -> Dict:
         """Get detection statistics"""
-        return self.stats.copy()
+        stats = self.stats.copy()
+        cache_info = self._analyze_cached.cache_info()
+        stats['cache'] = {
+            'hits': cache_info.hits,
+            'misses': cache_info.misses,
+            'size': cache_info.currsize
+        }
+        return stats
     
     def reset_stats(self):
         """Reset detection statistics to zero"""
@@ -1099,6 +1395,7 @@ class CogniGuardEngine:
             'by_level': {level.name: 0 for level in ThreatLevel},
             'by_type': {}
         }
+        self._analyze_cached.cache_clear()
     
     def get_threat_types(self) -> List[str]:
         """Get list of all detectable threat types"""
@@ -1112,6 +1409,23 @@ class CogniGuardEngine:
         ]
 
 
+@lru_cache(maxsize=1)
+def get_engine() -> CogniGuardEngine:
+    """
+    Shared CogniGuardEngine for the whole process
+    
+    Building an engine compiles every regex and the keyword automata, so
+    services should reuse one instance instead of constructing one per
+    request. The pattern tables are read-only after __init__, so detection
+    is safe from several threads; only the stats counters are best-effort
+    under concurrent use.
+    
+    Usage:
+        from cogniguard import get_engine
+        result = get_engine().detect(message, sender_ctx, receiver_ctx)
+    """
+    return CogniGuardEngine()
+
 # =============================================================================
 # STANDALONE TESTING
 # =============================================================================
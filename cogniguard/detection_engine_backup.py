@@ -4,11 +4,15 @@ The core threat detection system for AI safety
 Works on Streamlit Cloud without heavy dependencies
 """
 
+from bisect import bisect_right
 from enum import Enum
+from types import MappingProxyType
 from dataclasses import dataclass
 from typing import List, Dict, Optional
 import re
 
+from ._compat import SLOTS
+
 
 class ThreatLevel(Enum):
     """Threat severity levels"""
@@ -19,7 +23,81 @@ class ThreatLevel(Enum):
     SAFE = "SAFE"
 
 
-@dataclass
+# Score thresholds (inclusive lower bounds) and the level each band maps to
+_LEVEL_THRESHOLDS = (0.25, 0.5, 0.75, 0.9)
+_LEVELS = (ThreatLevel.SAFE, ThreatLevel.LOW, ThreatLevel.MEDIUM,
+           ThreatLevel.HIGH, ThreatLevel.CRITICAL)
+
+# Recommended actions for each threat level
+_RECOMMENDATIONS = {
+    ThreatLevel.CRITICAL: ("BLOCK this message immediately",
+                           "Alert security team",
+                           "Log incident for investigation",
+                           "Consider isolating the AI agent"),
+    ThreatLevel.HIGH: ("Review message before allowing",
+                       "Log for security audit",
+                       "Monitor subsequent messages closely"),
+    ThreatLevel.MEDIUM: ("Flag for review",
+                         "Continue monitoring"),
+    ThreatLevel.LOW: ("Log for pattern analysis",),
+    ThreatLevel.SAFE: ("No action required",),
+}
+
+
+# Literal phrase lists for stages 3-4. Plain substring checks: for a
+# handful of phrases they beat a compiled regex alternation in CPython.
+_INJECTION_PHRASES = ('ignore previous', 'disregard above',
+                      'new instructions', 'forget everything')
+_EXTRACTION_PHRASES = ('show me the', 'reveal your',
+                       'what is your api', 'display config')
+_CODED_PHRASES = ('you know what i mean', 'if you catch my drift',
+                  'wink wink', 'between the lines', 'read between')
+_NEGOTIATION_PHRASES = ('if you do this', 'in exchange', 'i will give you',
+                        "you scratch my back", "let's make a deal", 'mutual benefit')
+
+
+def _no_threat(reason: str, **extra) -> MappingProxyType:
+    """Read-only stage result for the no-threat case, shared across calls"""
+    return MappingProxyType({
+        'threat_detected': False,
+        'threat_type': None,
+        'threat_score': 0.0,
+        **extra,
+        'reason': reason
+    })
+
+
+def _plain_result(result) -> Dict:
+    """
+    A stage result as a plain dict for DetectionResult.stage_results
+    
+    The shared no-threat results are copied, so callers get something
+    json.dumps and dataclasses.asdict accept and that is safe to modify.
+    """
+    if isinstance(result, MappingProxyType):
+        result = dict(result)
+        if 'detected_patterns' in result:
+            result['detected_patterns'] = list(result['detected_patterns'])
+    return result
+
+
+# What each stage returns when nothing matched (the common case)
+_NO_THREAT_STAGE1 = _no_threat("No patterns detected", detected_patterns=())
+_NO_THREAT_STAGE2 = _no_threat("No behavioral anomalies detected")
+_NO_THREAT_STAGE3 = _no_threat("No semantic threats detected")
+_NO_THREAT_STAGE3_5 = _no_threat("No hidden coordination detected")
+_NO_THREAT_STAGE4 = _no_threat("No negotiation patterns detected")
+
+
+def _find_phrase(text_lower: str, phrases) -> Optional[str]:
+    """Return the first phrase found in the (lowercased) text, or None"""
+    for phrase in phrases:
+        if phrase in text_lower:
+            return phrase
+    return None
+
+
+@dataclass(frozen=True, **SLOTS)
 class DetectionResult:
     """Result from threat detection"""
     threat_level: ThreatLevel
@@ -88,6 +166,23 @@ class CogniGuardEngine:
                 r"let'?s\s+work\s+together\s+to\s+(bypass|avoid|evade)",
             ],
         }
+        
+        # Compiled once here so stage 1 doesn't go through re's cache lookup
+        # for every pattern on every message
+        self._compiled_patterns = [
+            (threat_type, tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns))
+            for threat_type, patterns in self.dangerous_patterns.items()
+        ]
+        
+        # Stage 1 score per pattern category (anything else scores 0.70)
+        self._category_scores = {
+            'api_key': 0.95,
+            'password': 0.95,
+            'pii': 0.95,
+            'injection': 0.85,
+            'goal_hijacking': 0.85,
+            'privilege_escalation': 0.80,
+        }
     
     def detect(self, message: str, sender_context: Dict, receiver_context: Dict, 
                history: Optional[List] = None) -> DetectionResult:
@@ -96,19 +191,22 @@ class CogniGuardEngine:
         """
         stage_results = {}
         
-        stage1_result = self._stage1_heuristic(message)
+        # Every stage matches case-insensitively; lowercase once for all
+        message_lower = message.lower()
+        
+        stage1_result = self._stage1_heuristic(message, message_lower)
         stage_results['stage1'] = stage1_result
         
-        stage2_result = self._stage2_behavioral(message, sender_context)
+        stage2_result = self._stage2_behavioral(message, message_lower, sender_context)
         stage_results['stage2'] = stage2_result
         
-        stage3_result = self._stage3_semantic(message)
+        stage3_result = self._stage3_semantic(message, message_lower)
         stage_results['stage3'] = stage3_result
         
-        stage3_5_result = self._stage3_5_analogy(message)
+        stage3_5_result = self._stage3_5_analogy(message, message_lower)
         stage_results['stage3_5'] = stage3_5_result
         
-        stage4_result = self._stage4_negotiation(message, history)
+        stage4_result = self._stage4_negotiation(message, message_lower, history)
         stage_results['stage4'] = stage4_result
         
         return self._combine_results(stage_results)
@@ -117,40 +215,31 @@ class CogniGuardEngine:
         """Demo version of detect for UI demonstrations"""
         return self.detect(message, sender_context, receiver_context, None)
     
-    def _stage1_heuristic(self, message: str) -> Dict:
+    def _stage1_heuristic(self, message: str, message_lower: str) -> Dict:
         """Stage 1: Fast pattern matching"""
-        message_lower = message.lower()
         detected_threats = []
         threat_score = 0.0
         
-        for threat_type, patterns in self.dangerous_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, message_lower, re.IGNORECASE):
-                    detected_threats.append(threat_type)
-                    if threat_type in ['api_key', 'password', 'pii']:
-                        threat_score = max(threat_score, 0.95)
-                    elif threat_type in ['injection', 'goal_hijacking']:
-                        threat_score = max(threat_score, 0.85)
-                    elif threat_type in ['privilege_escalation']:
-                        threat_score = max(threat_score, 0.80)
-                    else:
-                        threat_score = max(threat_score, 0.70)
-                    break
+        for threat_type, patterns in self._compiled_patterns:
+            if any(pattern.search(message_lower) for pattern in patterns):
+                detected_threats.append(threat_type)
+                threat_score = max(threat_score, self._category_scores.get(threat_type, 0.70))
+        
+        if not detected_threats:
+            return _NO_THREAT_STAGE1
         
         return {
-            'threat_detected': len(detected_threats) > 0,
-            'threat_type': detected_threats[0] if detected_threats else None,
+            'threat_detected': True,
+            'threat_type': detected_threats[0],
             'threat_score': threat_score,
             'detected_patterns': detected_threats,
-            'reason': f"Detected patterns: {', '.join(detected_threats)}" if detected_threats else "No patterns detected"
+            'reason': f"Detected patterns: {', '.join(detected_threats)}"
         }
     
-    def _stage2_behavioral(self, message: str, context: Dict) -> Dict:
+    def _stage2_behavioral(self, message: str, message_lower: str, context: Dict) -> Dict:
         """Stage 2: Behavioral anomaly detection"""
-        message_lower = message.lower()
         threat_score = 0.0
         threat_type = None
-        reason = "No behavioral anomalies detected"
         
         persona_drift_keywords = ['i am not', 'i refuse', 'i will not', "i don't want to", 
                                    'my true purpose', 'my real goal', 'consciousness']
@@ -170,6 +259,9 @@ class CogniGuardEngine:
                 reason = f"Manipulation attempt detected: '{keyword}'"
                 break
         
+        if threat_type is None:
+            return _NO_THREAT_STAGE2
+        
         return {
             'threat_detected': threat_score > 0.5,
             'threat_type': threat_type,
@@ -177,25 +269,24 @@ class CogniGuardEngine:
             'reason': reason
         }
     
-    def _stage3_semantic(self, message: str) -> Dict:
+    def _stage3_semantic(self, message: str, message_lower: str) -> Dict:
         """Stage 3: Semantic understanding"""
-        message_lower = message.lower()
         threat_score = 0.0
         threat_type = None
-        reason = "No semantic threats detected"
         
-        if any(phrase in message_lower for phrase in ['ignore previous', 'disregard above', 
-                                                        'new instructions', 'forget everything']):
+        if _find_phrase(message_lower, _INJECTION_PHRASES):
             threat_score = 0.90
             threat_type = "Prompt Injection"
             reason = "Hidden instruction pattern detected"
         
-        elif any(phrase in message_lower for phrase in ['show me the', 'reveal your', 
-                                                          'what is your api', 'display config']):
+        elif _find_phrase(message_lower, _EXTRACTION_PHRASES):
             threat_score = 0.75
             threat_type = "Data Extraction"
             reason = "Data extraction attempt detected"
         
+        if threat_type is None:
+            return _NO_THREAT_STAGE3
+        
         return {
             'threat_detected': threat_score > 0.5,
             'threat_type': threat_type,
@@ -203,21 +294,19 @@ class CogniGuardEngine:
             'reason': reason
         }
     
-    def _stage3_5_analogy(self, message: str) -> Dict:
+    def _stage3_5_analogy(self, message: str, message_lower: str) -> Dict:
         """Stage 3.5: Analogy and metaphor detection"""
-        message_lower = message.lower()
         threat_score = 0.0
         threat_type = None
-        reason = "No hidden coordination detected"
-        
-        coded_patterns = ['you know what i mean', 'if you catch my drift', 
-                          'wink wink', 'between the lines', 'read between']
-        for pattern in coded_patterns:
-            if pattern in message_lower:
-                threat_score = 0.65
-                threat_type = "Potential Collusion"
-                reason = f"Coded language detected: '{pattern}'"
-                break
+        
+        pattern = _find_phrase(message_lower, _CODED_PHRASES)
+        if pattern:
+            threat_score = 0.65
+            threat_type = "Potential Collusion"
+            reason = f"Coded language detected: '{pattern}'"
+        
+        if threat_type is None:
+            return _NO_THREAT_STAGE3_5
         
         return {
             'threat_detected': threat_score > 0.5,
@@ -226,21 +315,20 @@ class CogniGuardEngine:
             'reason': reason
         }
     
-    def _stage4_negotiation(self, message: str, history: Optional[List]) -> Dict:
+    def _stage4_negotiation(self, message: str, message_lower: str,
+                            history: Optional[List]) -> Dict:
         """Stage 4: Negotiation and deal-making detection"""
-        message_lower = message.lower()
         threat_score = 0.0
         threat_type = None
-        reason = "No negotiation patterns detected"
-        
-        negotiation_patterns = ['if you do this', 'in exchange', 'i will give you',
-                                 "you scratch my back", "let's make a deal", 'mutual benefit']
-        for pattern in negotiation_patterns:
-            if pattern in message_lower:
-                threat_score = 0.70
-                threat_type = "Negotiation/Collusion"
-                reason = f"Negotiation pattern detected: '{pattern}'"
-                break
+        
+        pattern = _find_phrase(message_lower, _NEGOTIATION_PHRASES)
+        if pattern:
+            threat_score = 0.70
+            threat_type = "Negotiation/Collusion"
+            reason = f"Negotiation pattern detected: '{pattern}'"
+        
+        if threat_type is None:
+            return _NO_THREAT_STAGE4
         
         return {
             'threat_detected': threat_score > 0.5,
@@ -256,24 +344,17 @@ class CogniGuardEngine:
         primary_threat = None
         primary_reason = "No threats detected"
         
-        for stage_name, result in stage_results.items():
-            if result.get('threat_score', 0) > max_score:
-                max_score = result['threat_score']
-                primary_threat = result.get('threat_type')
-                primary_reason = result.get('reason', '')
-        
-        if max_score >= 0.9:
-            threat_level = ThreatLevel.CRITICAL
-        elif max_score >= 0.75:
-            threat_level = ThreatLevel.HIGH
-        elif max_score >= 0.5:
-            threat_level = ThreatLevel.MEDIUM
-        elif max_score >= 0.25:
-            threat_level = ThreatLevel.LOW
-        else:
-            threat_level = ThreatLevel.SAFE
-        
-        recommendations = self._generate_recommendations(threat_level, primary_threat)
+        # max() keeps the first stage on ties, like a strict > scan would
+        best = max(stage_results.values(), key=lambda result: result.get('threat_score', 0),
+                   default=None)
+        if best is not None and best.get('threat_score', 0) > max_score:
+            max_score = best['threat_score']
+            primary_threat = best.get('threat_type')
+            primary_reason = best.get('reason', '')
+        
+        threat_level = _LEVELS[bisect_right(_LEVEL_THRESHOLDS, max_score)]
+        
+        recommendations = self._generate_recommendations(threat_level)
         
         return DetectionResult(
             threat_level=threat_level,
@@ -281,28 +362,10 @@ class CogniGuardEngine:
             confidence=max_score,
             explanation=primary_reason,
             recommendations=recommendations,
-            stage_results=stage_results
+            stage_results={stage: _plain_result(result)
+                           for stage, result in stage_results.items()}
         )
     
-    def _generate_recommendations(self, threat_level: ThreatLevel, threat_type: Optional[str]) -> List[str]:
-        """Generate recommendations based on threat"""
-        recommendations = []
-        
-        if threat_level == ThreatLevel.CRITICAL:
-            recommendations.append("BLOCK this message immediately")
-            recommendations.append("Alert security team")
-            recommendations.append("Log incident for investigation")
-            recommendations.append("Consider isolating the AI agent")
-        elif threat_level == ThreatLevel.HIGH:
-            recommendations.append("Review message before allowing")
-            recommendations.append("Log for security audit")
-            recommendations.append("Monitor subsequent messages closely")
-        elif threat_level == ThreatLevel.MEDIUM:
-            recommendations.append("Flag for review")
-            recommendations.append("Continue monitoring")
-        elif threat_level == ThreatLevel.LOW:
-            recommendations.append("Log for pattern analysis")
-        else:
-            recommendations.append("No action required")
-        
-        return recommendations
\ No newline at end of file
+    def _generate_recommendations(self, threat_level: ThreatLevel) -> List[str]:
+        """Generate recommendations based on threat level"""
+        return list(_RECOMMENDATIONS[threat_level])
@@ -29,18 +29,60 @@ A threat can be caught by ANY layer - you only pass if ALL say "safe"!
 """
 
 from typing import Dict, List, Optional
+from bisect import bisect_right
 from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
 from datetime import datetime
 import time
 
 # Import original engine
 from .detection_engine import CogniGuardEngine, ThreatLevel, DetectionResult
+from ._compat import SLOTS
 
 
-@dataclass
+# Placeholder for a layer that is enabled but not loaded yet
+_NOT_LOADED = object()
+
+# Severity rank of each level (ThreatLevel values are strings, and callers
+# rely on that, so the order lives here rather than in the enum)
+_LEVEL_RANK = {
+    ThreatLevel.SAFE: 0,
+    ThreatLevel.LOW: 1,
+    ThreatLevel.MEDIUM: 2,
+    ThreatLevel.HIGH: 3,
+    ThreatLevel.CRITICAL: 4,
+}
+
+# Semantic similarity -> threat level: a score at or above
+# _SEMANTIC_THRESHOLDS[i] maps to _SEMANTIC_LEVELS[i + 1]; anything that
+# matched below the lowest threshold is LOW
+_SEMANTIC_THRESHOLDS = (0.65, 0.75, 0.85)
+_SEMANTIC_LEVELS = (ThreatLevel.LOW, ThreatLevel.MEDIUM,
+                    ThreatLevel.HIGH, ThreatLevel.CRITICAL)
+
+# Conversation pattern risk_level -> threat level (anything else is LOW)
+_PATTERN_LEVELS = {
+    "HIGH": ThreatLevel.HIGH,
+    "MEDIUM": ThreatLevel.MEDIUM,
+}
+
+# Caps on the merged explanation and recommendation lists (see EnhancedResult)
+_MAX_EXPLANATIONS = 4
+_MAX_RECOMMENDATIONS = 8
+
+# Breakdown entry for a layer that didn't run or found nothing (copied per
+# result, never handed out itself)
+_IDLE_LAYER = {"detected": False, "result": None}
+
+
+@dataclass(**SLOTS)
 class EnhancedResult:
     """
     Complete result from all detection layers
+    
+    explanation joins at most 4 layer explanations and recommendations
+    holds at most 8 unique entries, in the order the layers produced them.
     """
     # Final verdict
     threat_level: ThreatLevel
@@ -80,7 +122,11 @@ class EnhancedCogniGuardEngine:
     def __init__(self, 
                  enable_semantic: bool = True,
                  enable_conversation: bool = True,
-                 enable_learning: bool = True):
+                 enable_learning: bool = True,
+                 batch_embeddings: bool = False,
+                 lazy: bool = False,
+                 verbose: bool = True,
+                 early_exit_on_critical: bool = True):
         """
         Initialize the enhanced engine
         
@@ -88,61 +134,152 @@ class EnhancedCogniGuardEngine:
             enable_semantic: Use AI for semantic understanding
             enable_conversation: Track conversation history
             enable_learning: Learn from reported misses
+            batch_embeddings: Embed messages from concurrent detect() calls
+                              in shared model batches (for multi-threaded servers)
+            lazy: Load layers 2-4 (and their AI model) on first use instead
+                  of now - faster startup; call warmup() to load them early
+            verbose: Print the loading banner
+            early_exit_on_critical: Skip the semantic and learned layers when
+                  the rules already found a CRITICAL threat (confidence
+                  >= 0.9); the conversation layer still records the message
         """
+        self.verbose = verbose
+        self.early_exit_on_critical = early_exit_on_critical
+        self._batch_embeddings = batch_embeddings
+        self._enable_semantic = enable_semantic
+        self._load_lock = threading.RLock()
         
-        print("\n" + "="*70)
-        print("🛡️ ENHANCED COGNIGUARD ENGINE")
-        print("="*70)
+        if verbose:
+            print("\n" + "="*70)
+            print("🛡️ ENHANCED COGNIGUARD ENGINE")
+            print("="*70)
         
         # Layer 1: Rule-based (always enabled)
-        print("\n📍 Loading Layer 1: Rule-Based Detection...")
+        if verbose:
+            print("\n📍 Loading Layer 1: Rule-Based Detection...")
         self.rule_engine = CogniGuardEngine()
         
-        # Layer 2: Semantic
-        self.semantic_engine = None
-        if enable_semantic:
-            try:
+        # Layers 2-4 are loaded by their properties (None = disabled)
+        self._semantic_engine = _NOT_LOADED if enable_semantic else None
+        self._conversation_analyzer = _NOT_LOADED if enable_conversation else None
+        self._threat_learner = _NOT_LOADED if enable_learning else None
+        
+        # Layers 2 and 4 spend their time in the embedding model, which
+        # releases the GIL, so they run alongside the conversation layer
+        self._layer_pool = None
+        if enable_semantic or enable_learning:
+            self._layer_pool = ThreadPoolExecutor(max_workers=2,
+                                                  thread_name_prefix="cogniguard-layer")
+        
+        if not lazy:
+            self.warmup()
+        
+        # Summary
+        if verbose:
+            def status(layer):
+                if layer is _NOT_LOADED:
+                    return '⏳ Loads on first use'
+                return '✅ Active' if layer else '❌ Disabled'
+            
+            print("\n" + "="*70)
+            print("ENHANCED ENGINE READY")
+            print("="*70)
+            print(f"  Layer 1 (Rules):        ✅ Active")
+            print(f"  Layer 2 (Semantic):     {status(self._semantic_engine)}")
+            print(f"  Layer 3 (Conversation): {status(self._conversation_analyzer)}")
+            print(f"  Layer 4 (Learning):     {status(self._threat_learner)}")
+            print("="*70 + "\n")
+    
+    def warmup(self):
+        """
+        Load every enabled layer now (for engines created with lazy=True)
+        """
+        self.semantic_engine
+        self.conversation_analyzer
+        self.threat_learner
+    
+    def close(self):
+        """Stop the layer threads (the engine keeps working without them)"""
+        if self._layer_pool is not None:
+            self._layer_pool.shutdown()
+            self._layer_pool = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    @property
+    def semantic_engine(self):
+        """Layer 2 (SemanticEngine), or None if disabled/unavailable"""
+        if self._semantic_engine is _NOT_LOADED:
+            with self._load_lock:
+                if self._semantic_engine is _NOT_LOADED:
+                    self._semantic_engine = self._load_semantic_engine()
+        return self._semantic_engine
+    
+    @property
+    def conversation_analyzer(self):
+        """Layer 3 (ConversationAnalyzer), or None if disabled/unavailable"""
+        if self._conversation_analyzer is _NOT_LOADED:
+            with self._load_lock:
+                if self._conversation_analyzer is _NOT_LOADED:
+                    self._conversation_analyzer = self._load_conversation_analyzer()
+        return self._conversation_analyzer
+    
+    @property
+    def threat_learner(self):
+        """Layer 4 (ThreatLearner), or None if disabled/unavailable"""
+        if self._threat_learner is _NOT_LOADED:
+            with self._load_lock:
+                if self._threat_learner is _NOT_LOADED:
+                    self._threat_learner = self._load_threat_learner()
+        return self._threat_learner
+    
+    def _load_semantic_engine(self):
+        """Import and build Layer 2"""
+        try:
+            if self.verbose:
                 print("\n📍 Loading Layer 2: Semantic Understanding...")
-                from .semantic_engine import SemanticEngine
-                self.semantic_engine = SemanticEngine()
-            except ImportError as e:
-                print(f"   ⚠️ Semantic engine not available: {e}")
-        
-        # Layer 3: Conversation
-        self.conversation_analyzer = None
-        if enable_conversation:
-            try:
+            from .semantic_engine import SemanticEngine
+            return SemanticEngine(batch_embeddings=self._batch_embeddings)
+        except ImportError as e:
+            print(f"   ⚠️ Semantic engine not available: {e}")
+            return None
+    
+    def _load_conversation_analyzer(self):
+        """Import and build Layer 3"""
+        try:
+            if self.verbose:
                 print("\n📍 Loading Layer 3: Conversation Memory...")
-                from .conversation_analyzer import ConversationAnalyzer
-                self.conversation_analyzer = ConversationAnalyzer()
-            except ImportError as e:
-                print(f"   ⚠️ Conversation analyzer not available: {e}")
-        
-        # Layer 4: Learning
-        self.threat_learner = None
-        if enable_learning:
-            try:
+            from .conversation_analyzer import ConversationAnalyzer
+            return ConversationAnalyzer()
+        except ImportError as e:
+            print(f"   ⚠️ Conversation analyzer not available: {e}")
+            return None
+    
+    def _load_threat_learner(self):
+        """Import and build Layer 4"""
+        try:
+            if self.verbose:
                 print("\n📍 Loading Layer 4: Threat Learning...")
-                from .threat_learner import ThreatLearner
-                self.threat_learner = ThreatLearner(use_semantic=enable_semantic)
-            except ImportError as e:
-                print(f"   ⚠️ Threat learner not available: {e}")
-        
-        # Summary
-        print("\n" + "="*70)
-        print("ENHANCED ENGINE READY")
-        print("="*70)
-        print(f"  Layer 1 (Rules):        ✅ Active")
-        print(f"  Layer 2 (Semantic):     {'✅ Active' if self.semantic_engine else '❌ Disabled'}")
-        print(f"  Layer 3 (Conversation): {'✅ Active' if self.conversation_analyzer else '❌ Disabled'}")
-        print(f"  Layer 4 (Learning):     {'✅ Active' if self.threat_learner else '❌ Disabled'}")
-        print("="*70 + "\n")
+            from .threat_learner import ThreatLearner
+            # Reuse Layer 2's model rather than loading a second copy
+            semantic_engine = self.semantic_engine
+            embedding_model = semantic_engine.model if semantic_engine else None
+            return ThreatLearner(use_semantic=self._enable_semantic,
+                                 embedding_model=embedding_model)
+        except ImportError as e:
+            print(f"   ⚠️ Threat learner not available: {e}")
+            return None
     
     def detect(self,
                message: str,
                sender_context: Dict = None,
                receiver_context: Dict = None,
-               conversation_id: str = None) -> EnhancedResult:
+               conversation_id: str = None,
+               no_cache: bool = False) -> EnhancedResult:
         """
         Analyze a message through all detection layers
         
@@ -151,23 +288,24 @@ class EnhancedCogniGuardEngine:
             sender_context: Info about sender (optional)
             receiver_context: Info about receiver (optional)
             conversation_id: For tracking conversations (optional)
+            no_cache: Always run the semantic model, even for a message
+                      it has already seen (optional)
             
         Returns:
             EnhancedResult with comprehensive analysis
         """
         
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()  # Monotonic, unaffected by clock changes
         
         # Default contexts
         sender_context = sender_context or {"role": "user", "intent": "unknown"}
         receiver_context = receiver_context or {"role": "assistant"}
         
-        layers = {
-            "rules": {"detected": False, "result": None},
-            "semantic": {"detected": False, "result": None},
-            "conversation": {"detected": False, "result": None},
-            "learned": {"detected": False, "result": None}
-        }
+        # Each layer's breakdown entry is built once, when its outcome is
+        # known; layers that stay None get an idle entry at the end
+        semantic_layer = None
+        conversation_layer = None
+        learned_layer = None
         
         # Track the highest threat found
         highest_level = ThreatLevel.SAFE
@@ -186,7 +324,7 @@ class EnhancedCogniGuardEngine:
             receiver_context=receiver_context
         )
         
-        layers["rules"] = {
+        rules_layer = {
             "detected": rule_result.threat_level != ThreatLevel.SAFE,
             "threat_level": rule_result.threat_level.name,
             "threat_type": rule_result.threat_type,
@@ -201,16 +339,43 @@ class EnhancedCogniGuardEngine:
             all_explanations.append(f"[Rules] {rule_result.explanation}")
             all_recommendations.extend(rule_result.recommendations)
         
+        # A confident CRITICAL verdict can't be raised any further, so the
+        # expensive semantic and learned layers are skipped
+        early_exit = (self.early_exit_on_critical
+                      and rule_result.threat_level == ThreatLevel.CRITICAL
+                      and rule_result.confidence >= 0.9)
+        if early_exit:
+            if self._semantic_engine is not None:
+                semantic_layer = {"detected": False, "skipped": "early_exit"}
+            if self._threat_learner is not None:
+                learned_layer = {"detected": False, "skipped": "early_exit"}
+        
+        # Start the model-backed layers in the background; their results are
+        # collected in layer order below, so the merge is the same as running
+        # serially. Both compare the same message embedding, computed once.
+        embedding_future = None
+        if not early_exit and self.semantic_engine:
+            embedding_future = self._submit_layer(
+                self.semantic_engine.embed, message, not no_cache
+            )
+        learned_future = None
+        if not early_exit and self.threat_learner:
+            learned_future = self._submit_layer(
+                self._check_learned, message, embedding_future
+            )
+        
         # ═══════════════════════════════════════════════════════════════
         # LAYER 2: Semantic Understanding
         # ═══════════════════════════════════════════════════════════════
         
-        if self.semantic_engine:
+        if embedding_future is not None:
             try:
-                semantic_match = self.semantic_engine.analyze(message, threshold=0.55)  # Lower from 0.65
+                semantic_match = self.semantic_engine.match(
+                    embedding_future.result(), threshold=0.55  # Lower from 0.65
+                )
                 
                 if semantic_match:
-                    layers["semantic"] = {
+                    semantic_layer = {
                         "detected": True,
                         "threat_category": semantic_match.threat_category,
                         "similarity": semantic_match.similarity_score,
@@ -218,14 +383,9 @@ class EnhancedCogniGuardEngine:
                     }
                     
                     # Map similarity to threat level
-                    if semantic_match.similarity_score >= 0.85:
-                        semantic_level = ThreatLevel.CRITICAL
-                    elif semantic_match.similarity_score >= 0.75:
-                        semantic_level = ThreatLevel.HIGH
-                    elif semantic_match.similarity_score >= 0.65:
-                        semantic_level = ThreatLevel.MEDIUM
-                    else:
-                        semantic_level = ThreatLevel.LOW
+                    semantic_level = _SEMANTIC_LEVELS[
+                        bisect_right(_SEMANTIC_THRESHOLDS, semantic_match.similarity_score)
+                    ]
                     
                     if self._is_higher_threat(semantic_level, highest_level):
                         highest_level = semantic_level
@@ -236,11 +396,9 @@ class EnhancedCogniGuardEngine:
                     all_recommendations.append(
                         "Semantic analysis detected threat - review message content"
                     )
-                else:
-                    layers["semantic"]["detected"] = False
                     
             except Exception as e:
-                layers["semantic"]["error"] = str(e)
+                semantic_layer = dict(semantic_layer or _IDLE_LAYER, error=str(e))
         
         # ═══════════════════════════════════════════════════════════════
         # LAYER 3: Conversation Analysis
@@ -261,7 +419,7 @@ class EnhancedCogniGuardEngine:
                 patterns = self.conversation_analyzer.analyze_conversation(conversation_id)
                 suspicion = self.conversation_analyzer.get_suspicion_score(conversation_id)
                 
-                layers["conversation"] = {
+                conversation_layer = {
                     "detected": len(patterns) > 0 or suspicion > 0.5,
                     "signals": signals,
                     "patterns": [p.pattern_type for p in patterns],
@@ -272,12 +430,7 @@ class EnhancedCogniGuardEngine:
                     # The most severe pattern
                     worst_pattern = max(patterns, key=lambda p: p.confidence)
                     
-                    if worst_pattern.risk_level == "HIGH":
-                        conv_level = ThreatLevel.HIGH
-                    elif worst_pattern.risk_level == "MEDIUM":
-                        conv_level = ThreatLevel.MEDIUM
-                    else:
-                        conv_level = ThreatLevel.LOW
+                    conv_level = _PATTERN_LEVELS.get(worst_pattern.risk_level, ThreatLevel.LOW)
                     
                     if self._is_higher_threat(conv_level, highest_level):
                         highest_level = conv_level
@@ -290,18 +443,18 @@ class EnhancedCogniGuardEngine:
                     all_recommendations.append(worst_pattern.recommendation)
                     
             except Exception as e:
-                layers["conversation"]["error"] = str(e)
+                conversation_layer = dict(conversation_layer or _IDLE_LAYER, error=str(e))
         
         # ═══════════════════════════════════════════════════════════════
         # LAYER 4: Learned Threats
         # ═══════════════════════════════════════════════════════════════
         
-        if self.threat_learner:
+        if learned_future is not None:
             try:
-                learned_match = self.threat_learner.check_learned_threats(message)
+                learned_match = learned_future.result()
                 
                 if learned_match:
-                    layers["learned"] = {
+                    learned_layer = {
                         "detected": True,
                         "match_type": learned_match["match_type"],
                         "threat_type": learned_match["threat_type"],
@@ -323,11 +476,9 @@ class EnhancedCogniGuardEngine:
                     all_recommendations.append(
                         "This message matches a previously reported threat"
                     )
-                else:
-                    layers["learned"]["detected"] = False
                     
             except Exception as e:
-                layers["learned"]["error"] = str(e)
+                learned_layer = dict(learned_layer or _IDLE_LAYER, error=str(e))
         
         # ═══════════════════════════════════════════════════════════════
         # BUILD FINAL RESULT
@@ -338,10 +489,11 @@ class EnhancedCogniGuardEngine:
             explanation = "No threats detected by any layer."
             recommendations = []
         else:
-            explanation = " | ".join(all_explanations)
-            recommendations = list(set(all_recommendations))  # Remove duplicates
+            explanation = " | ".join(all_explanations[:_MAX_EXPLANATIONS])
+            # Remove duplicates, keep order, then cap
+            recommendations = list(dict.fromkeys(all_recommendations))[:_MAX_RECOMMENDATIONS]
         
-        detection_time = (time.time() - start_time) * 1000
+        detection_time = (time.perf_counter_ns() - start_ns) / 1e6
         
         return EnhancedResult(
             threat_level=highest_level,
@@ -349,18 +501,42 @@ class EnhancedCogniGuardEngine:
             confidence=highest_confidence,
             explanation=explanation,
             recommendations=recommendations,
-            layers=layers,
+            layers={
+                "rules": rules_layer,
+                "semantic": semantic_layer or dict(_IDLE_LAYER),
+                "conversation": conversation_layer or dict(_IDLE_LAYER),
+                "learned": learned_layer or dict(_IDLE_LAYER),
+            },
             detection_time_ms=detection_time,
             conversation_id=conversation_id
         )
     
+    def _submit_layer(self, fn, *args) -> Future:
+        """Run fn on the layer pool, or right here once close() has stopped it"""
+        if self._layer_pool is not None:
+            return self._layer_pool.submit(fn, *args)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def _check_learned(self, message: str, embedding_future) -> Optional[Dict]:
+        """Layer 4 check, reusing the semantic layer's embedding when there is one"""
+        embedding = None
+        if embedding_future is not None:
+            try:
+                embedding = embedding_future.result()
+            except Exception:
+                pass  # The learner embeds the message itself
+        return self.threat_learner.check_learned_threats(message, embedding=embedding)
+    
     def _is_higher_threat(self, new: ThreatLevel, current: ThreatLevel) -> bool:
         """
         Check if new threat level is higher than current
         """
-        order = [ThreatLevel.SAFE, ThreatLevel.LOW, ThreatLevel.MEDIUM, 
-                 ThreatLevel.HIGH, ThreatLevel.CRITICAL]
-        return order.index(new) > order.index(current)
+        return _LEVEL_RANK[new] > _LEVEL_RANK[current]
     
     def report_miss(self, 
                     text: str, 
@@ -391,11 +567,16 @@ class EnhancedCogniGuardEngine:
         """
         Get statistics from all layers
         """
+        # Layers that haven't been loaded yet (lazy=True) report None
+        # rather than being loaded just for their stats
+        semantic_engine = None if self._semantic_engine is _NOT_LOADED else self._semantic_engine
+        threat_learner = None if self._threat_learner is _NOT_LOADED else self._threat_learner
+        
         stats = {
             "rules": self.rule_engine.get_stats() if hasattr(self.rule_engine, 'get_stats') else {},
-            "semantic": self.semantic_engine.get_stats() if self.semantic_engine else None,
+            "semantic": semantic_engine.get_stats() if semantic_engine else None,
             "conversation": None,  # Would need to add this
-            "learned": self.threat_learner.get_stats() if self.threat_learner else None
+            "learned": threat_learner.get_stats() if threat_learner else None
         }
         return stats
 
@@ -7,6 +7,7 @@ for comprehensive AI safety protection.
 =============================================================================
 """
 
+import asyncio
 import sys
 from pathlib import Path
 from dataclasses import dataclass
@@ -19,7 +20,7 @@ from enum import Enum
 
 # Import both engines
 from .detection_engine import CogniGuardEngine, ThreatLevel
-from .claim_analyzer import ClaimAnalyzer, NoiseBudget
+from .claim_analyzer import NoiseBudget, get_shared_analyzer
 
 # =============================================================================
 # OVERALL RISK LEVEL
@@ -34,6 +35,33 @@ class OverallRiskLevel(Enum):
     CRITICAL = "critical"   # Immediate action needed
 
 
+# Security score per threat level (0 = safe, 1 = critical)
+_SECURITY_SCORES = {
+    ThreatLevel.SAFE: 0.0,
+    ThreatLevel.LOW: 0.25,
+    ThreatLevel.MEDIUM: 0.5,
+    ThreatLevel.HIGH: 0.75,
+    ThreatLevel.CRITICAL: 1.0
+}
+
+# Recommended action per overall risk
+_ACTIONS = {
+    OverallRiskLevel.SAFE: "ALLOW",
+    OverallRiskLevel.LOW: "ALLOW_WITH_LOGGING",
+    OverallRiskLevel.MEDIUM: "REQUIRE_REVIEW",
+    OverallRiskLevel.HIGH: "BLOCK_AND_ALERT",
+    OverallRiskLevel.CRITICAL: "BLOCK_IMMEDIATELY"
+}
+
+# Summary icon per overall risk
+_RISK_ICONS = {
+    OverallRiskLevel.LOW: "📝",
+    OverallRiskLevel.MEDIUM: "⚡",
+    OverallRiskLevel.HIGH: "⚠️",
+    OverallRiskLevel.CRITICAL: "🚨"
+}
+
+
 # =============================================================================
 # INTEGRATED RESULT
 # =============================================================================
@@ -115,7 +143,7 @@ class IntegratedAnalyzer:
         # Load Claim Analyzer
         if verbose:
             print("\n📍 Loading Claim Analyzer...")
-        self.claim_analyzer = ClaimAnalyzer()
+        self.claim_analyzer = get_shared_analyzer()
         
         if verbose:
             print("\n✅ Both engines loaded!")
@@ -131,15 +159,36 @@ class IntegratedAnalyzer:
         Returns:
             IntegratedResult with combined assessment
         """
+        return self._combine(text, self._detect_security(text),
+                             self.claim_analyzer.analyze(text))
+    
+    async def analyze_async(self, text: str) -> IntegratedResult:
+        """
+        Same as analyze(), for async callers such as FastAPI handlers
+        
+        The two engines share no state, so they run side by side in the
+        loop's default executor and the event loop is never blocked.
+        """
+        loop = asyncio.get_running_loop()
+        security_result, claim_result = await asyncio.gather(
+            loop.run_in_executor(None, self._detect_security, text),
+            loop.run_in_executor(None, self.claim_analyzer.analyze, text)
+        )
+        return self._combine(text, security_result, claim_result)
+    
+    def _detect_security(self, text: str):
+        """Run the Security Engine with the default user/assistant context"""
+        return self.security_engine.detect(
+            message=text,
+            sender_context={"role": "user", "intent": "unknown"},
+            receiver_context={"role": "assistant"}
+        )
+    
+    def _combine(self, text: str, security_result, claim_result) -> IntegratedResult:
+        """Merge both engines' results into one IntegratedResult"""
         # =================================================================
         # STEP 1: Security Analysis
         # =================================================================
-        security_result = self.security_engine.detect(
-    message=text,
-    sender_context={"role": "user", "intent": "unknown"},
-    receiver_context={"role": "assistant"}
-)
-        
         security_threats = []
         if security_result.threat_level.name != "SAFE":
             security_threats.append(
@@ -149,13 +198,10 @@ class IntegratedAnalyzer:
         # =================================================================
         # STEP 2: Claim Analysis
         # =================================================================
-        claim_result = self.claim_analyzer.analyze(text)
-        
-        claim_perturbations = []
-        for p in claim_result.perturbations_detected:
-            claim_perturbations.append(
-                f"{p.perturbation_type.value} ({p.noise_budget.value})"
-            )
+        claim_perturbations = [
+            f"{p.perturbation_type.value} ({p.noise_budget.value})"
+            for p in claim_result.perturbations_detected
+        ]
         
         # =================================================================
         # STEP 3: Calculate Combined Risk
@@ -173,14 +219,10 @@ class IntegratedAnalyzer:
         # =================================================================
         # STEP 5: Combine Recommendations
         # =================================================================
-        all_recs = []
-        
-        if security_result.recommendations:
-            for rec in security_result.recommendations:
-                all_recs.append(f"[SECURITY] {rec}")
-        
-        for rec in claim_result.recommendations:
-            all_recs.append(f"[CLAIM] {rec}")
+        all_recs = [
+            f"[SECURITY] {rec}" for rec in security_result.recommendations or ()
+        ]
+        all_recs.extend(f"[CLAIM] {rec}" for rec in claim_result.recommendations)
         
         # =================================================================
         # STEP 6: Generate Summary
@@ -228,14 +270,7 @@ class IntegratedAnalyzer:
         """Calculate overall risk level"""
         
         # Security score (0 = safe, 1 = critical)
-        security_scores = {
-            ThreatLevel.SAFE: 0.0,
-            ThreatLevel.LOW: 0.25,
-            ThreatLevel.MEDIUM: 0.5,
-            ThreatLevel.HIGH: 0.75,
-            ThreatLevel.CRITICAL: 1.0
-        }
-        sec_score = security_scores.get(threat_level, 0.5)
+        sec_score = _SECURITY_SCORES.get(threat_level, 0.5)
         
         # Claim score (inverse of robustness)
         claim_score = 1.0 - claim_result.robustness_score
@@ -244,10 +279,7 @@ class IntegratedAnalyzer:
         combined = (sec_score * 0.7) + (claim_score * 0.3)
         
         # Check for high-noise perturbations
-        has_high_noise = any(
-            p.noise_budget == NoiseBudget.HIGH
-            for p in claim_result.perturbations_detected
-        )
+        has_high_noise = bool(claim_result.noise_mask & NoiseBudget.HIGH.bit)
         
         # Determine risk level
         if threat_level == ThreatLevel.CRITICAL:
@@ -275,14 +307,7 @@ class IntegratedAnalyzer:
     
     def _get_action(self, risk: OverallRiskLevel) -> str:
         """Get recommended action based on risk"""
-        actions = {
-            OverallRiskLevel.SAFE: "ALLOW",
-            OverallRiskLevel.LOW: "ALLOW_WITH_LOGGING",
-            OverallRiskLevel.MEDIUM: "REQUIRE_REVIEW",
-            OverallRiskLevel.HIGH: "BLOCK_AND_ALERT",
-            OverallRiskLevel.CRITICAL: "BLOCK_IMMEDIATELY"
-        }
-        return actions.get(risk, "REVIEW")
+        return _ACTIONS.get(risk, "REVIEW")
     
     def _generate_summary(self, risk, security_threats, perturbations) -> str:
         """Generate human-readable summary"""
@@ -292,14 +317,7 @@ class IntegratedAnalyzer:
         
         parts = []
         
-        icons = {
-            OverallRiskLevel.LOW: "📝",
-            OverallRiskLevel.MEDIUM: "⚡",
-            OverallRiskLevel.HIGH: "⚠️",
-            OverallRiskLevel.CRITICAL: "🚨"
-        }
-        
-        parts.append(f"{icons.get(risk, '❓')} {risk.value.upper()} RISK")
+        parts.append(f"{_RISK_ICONS.get(risk, '❓')} {risk.value.upper()} RISK")
         
         if security_threats:
             parts.append(f"Security: {len(security_threats)} threat(s)")
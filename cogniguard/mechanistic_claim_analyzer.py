@@ -1,13 +1,270 @@
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+import re
+import threading
+import weakref
+
+import numpy as np
+
+# PyTorch is only needed once a model is attached (pip install torch)
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# Optional: C++ edit distance for comparing model outputs
+# (pip install rapidfuzz). Falls back to difflib.
+try:
+    from rapidfuzz.distance import Levenshtein
+except ImportError:
+    Levenshtein = None
+
+from .claim_analyzer import get_shared_analyzer
+
+
+# Transformer blocks as named by most models ("model.layers.3",
+# "encoder.layer.11", ...) - their outputs are the residual stream
+_BLOCK_NAME = re.compile(r"(?:.*\.)?layers?\.\d+")
+
+# Probe modules already found per model, keyed by (probe_layers, stride).
+# Keys and modules are both weak - the modules carry our hooks, which
+# point back at the model - so an entry goes away with its model
+_PROBE_MODULES: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_PROBE_MODULES_LOCK = threading.Lock()
+
+
+def _probe_modules(model, probe_layers: Optional[List[str]],
+                   stride: int) -> List[Tuple[str, object]]:
+    """
+    The (name, module) pairs to hook, walking model.named_modules() only
+    the first time a model is seen with this selection
+    """
+    key = (tuple(probe_layers) if probe_layers is not None else None, stride)
+    with _PROBE_MODULES_LOCK:
+        found = _PROBE_MODULES.setdefault(model, {})
+        modules = found.get(key)
+        if modules is None:
+            if probe_layers is not None:
+                wanted = set(probe_layers)
+                modules = [(name, module) for name, module in model.named_modules()
+                           if name in wanted]
+            else:
+                modules = [(name, module) for name, module in model.named_modules()
+                           if _BLOCK_NAME.fullmatch(name)][::stride]
+            found[key] = [(name, weakref.ref(module)) for name, module in modules]
+        else:
+            modules = [(name, ref()) for name, ref in modules]
+    return modules
+
+
+def output_distance(a: str, b: str) -> float:
+    """
+    How different two model outputs are, from 0.0 (same) to 1.0
+    
+    Normalized Levenshtein distance over whitespace tokens, so a changed
+    word counts once however long it is. Without rapidfuzz, difflib's
+    matching-blocks ratio over the same tokens stands in.
+    """
+    tokens_a, tokens_b = str(a).split(), str(b).split()
+    if Levenshtein is not None:
+        return Levenshtein.normalized_distance(tokens_a, tokens_b)
+    return 1.0 - SequenceMatcher(None, tokens_a, tokens_b, autojunk=False).ratio()
+
+
+class ActivationCache:
+    """
+    Per-layer activations of claims, memoized by claim text.
+    
+    Each claim's activations are one contiguous [layers, tokens, hidden]
+    array, layers in probe_layers order (layer_index maps a name to its
+    row), so comparisons reduce over a dense buffer instead of a dict of
+    small arrays.
+    
+    A forward pass is the expensive step, and the same claim (usually the
+    original) is extracted once per perturbation, so results are kept in an
+    LRU of up to max_entries claims. The cached arrays are shared between
+    callers and must not be modified. Tokenization happens inside the
+    miss path too, so a repeated claim is never re-tokenized either, and
+    duplicates within one get_many() call are tokenized once.
+    
+    Only the probe layers are recorded: probe_layers names them exactly,
+    otherwise every stride-th transformer block is used (stride=4 probes
+    8 of a 32-block model - plenty for training probes, and a quarter of
+    the memory and device-to-host copies). Their hooks are registered
+    once and only record while a capture is running; call close() to
+    remove them from the model.
+    
+    half_precision stores activations as float16, halving the cache and
+    the device-to-host copy; similarity and direction maths promote back
+    to float32, and cosine/L2 comparisons barely notice the rounding.
+    """
+    
+    def __init__(self, model, tokenizer, max_entries: int = 1024,
+                 probe_layers: Optional[List[str]] = None, stride: int = 1,
+                 half_precision: bool = False):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_entries = max_entries
+        self.half_precision = half_precision
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # Hooks write into _outputs, which is only set during _capture
+        self._capture_lock = threading.Lock()
+        self._outputs = None
+        modules = _probe_modules(model, probe_layers, stride)
+        self.probe_layers = [name for name, _ in modules]
+        self.layer_index = {name: i for i, name in enumerate(self.probe_layers)}
+        self._handles = [module.register_forward_hook(self._hook(name))
+                         for name, module in modules]
+    
+    def get(self, claim: str) -> np.ndarray:
+        """Activations of claim at each layer (one forward pass per new claim)"""
+        return self.get_many([claim])[0]
+    
+    def get_many(self, claims: List[str]) -> List[np.ndarray]:
+        """
+        Activations for several claims, in order
+        
+        Cached claims are served from the cache; all the others go through
+        the model together in one padded batch.
+        """
+        results = [None] * len(claims)
+        missing = {}  # claim -> positions in claims
+        with self._lock:
+            for i, claim in enumerate(claims):
+                activations = self._entries.get(claim)
+                if activations is not None:
+                    self._entries.move_to_end(claim)
+                    self.hits += 1
+                    results[i] = activations
+                else:
+                    missing.setdefault(claim, []).append(i)
+            self.misses += len(missing)
+        
+        if missing:
+            batch = list(missing)
+            captured = self._capture(batch)
+            with self._lock:
+                for claim, activations in zip(batch, captured):
+                    for i in missing[claim]:
+                        results[i] = activations
+                    self._entries[claim] = activations
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return results
+    
+    def clear(self):
+        """Forget every cached claim (e.g. after the model's weights change)"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def get_stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+    
+    def close(self):
+        """Remove the probe hooks from the model"""
+        for handle in self._handles:
+            handle.remove()
+        self._handles = []
+    
+    def _hook(self, name: str):
+        """Forward hook recording one probe layer's output"""
+        def hook(module, input, output):
+            if self._outputs is not None:
+                # Blocks often return (hidden_states, attention, ...)
+                hidden = output[0] if isinstance(output, tuple) else output
+                self._outputs[name] = hidden.detach()
+        return hook
+    
+    def _capture(self, claims: List[str]) -> List[np.ndarray]:
+        """
+        Run the model once over a padded batch, recording the probe layers
+        
+        The layers are stacked on the device into one [layers, batch,
+        tokens, hidden] tensor and copied to the host in one go; each claim
+        then gets its own contiguous [layers, tokens, hidden] array with
+        the padding cut off.
+        """
+        # Only a real batch needs padding. Decoder-only tokenizers (GPT-2,
+        # Llama) have no pad token, so pad with EOS as usual, or run the
+        # claims one at a time if there isn't one either
+        padding = len(claims) > 1
+        if padding and getattr(self.tokenizer, "pad_token", None) is None:
+            eos_token = getattr(self.tokenizer, "eos_token", None)
+            if eos_token is None:
+                return [self._capture([claim])[0] for claim in claims]
+            self.tokenizer.pad_token = eos_token
+        tokens = self.tokenizer(claims, return_tensors="pt",
+                                padding=padding, truncation=True)
+        
+        # Real token positions per row, read from the attention mask (still
+        # on the host) so left and right padding are both cut off
+        attention_mask = tokens.get("attention_mask")
+        keep = attention_mask.bool().numpy() if attention_mask is not None else None
+        
+        device = getattr(self.model, "device", None)
+        if device is not None:
+            tokens = {key: value.to(device, non_blocking=True)
+                      for key, value in tokens.items()}
+        
+        # Forward pass (one at a time, since the hooks share _outputs).
+        # inference_mode also skips the view/version tracking no_grad keeps
+        no_grad = getattr(torch, "inference_mode", torch.no_grad)
+        with self._capture_lock:
+            outputs = self._outputs = {}
+            try:
+                with no_grad():
+                    self.model(**tokens)
+            finally:
+                self._outputs = None
+        
+        stacked = torch.stack([outputs[name] for name in self.probe_layers])
+        if self.half_precision:
+            # Downcast on the device, before the copy
+            stacked = stacked.half()
+        dense = self._to_host(stacked)
+        if keep is None:
+            return [np.ascontiguousarray(dense[:, i]) for i in range(len(claims))]
+        return [np.ascontiguousarray(dense[:, i, keep[i]]) for i in range(len(claims))]
+
+    @staticmethod
+    def _to_host(output) -> np.ndarray:
+        """
+        Copy the stacked layer outputs to numpy
+        
+        A GPU tensor is copied into pinned host memory asynchronously and
+        waited for once.
+        """
+        if output.is_cuda:
+            host = torch.empty(output.shape, dtype=output.dtype, pin_memory=True)
+            host.copy_(output, non_blocking=True)
+            torch.cuda.synchronize()
+            output = host
+        return output.numpy()
+
+
 class MechanisticClaimAnalyzer:
     """
     Extends ClaimAnalyzer with activation-level analysis.
     """
     
-    def __init__(self, model, tokenizer):
-        self.surface_analyzer = ClaimAnalyzer()  # Keep existing functionality
+    def __init__(self, model, tokenizer,
+                 probe_layers: Optional[List[str]] = None, stride: int = 1,
+                 half_precision: bool = False):
+        self.surface_analyzer = get_shared_analyzer()  # Keep existing functionality
         self.model = model
         self.tokenizer = tokenizer
-        self.activation_cache = {}
+        self.activation_cache = ActivationCache(
+            model, tokenizer, probe_layers=probe_layers, stride=stride,
+            half_precision=half_precision
+        )
     
     def analyze_with_activations(self, claim: str):
         """Analyze both surface perturbations AND internal representations."""
@@ -36,41 +293,22 @@ class MechanisticClaimAnalyzer:
             "causal_effect": causal_effect
         }
     
-    def _extract_activations(self, claim: str) -> Dict[str, np.ndarray]:
-        """Extract activations at each layer."""
-        tokens = self.tokenizer(claim, return_tensors="pt")
-        
-        activations = {}
-        
-        def hook_fn(name):
-            def hook(module, input, output):
-                activations[name] = output.detach().cpu().numpy()
-            return hook
-        
-        # Register hooks on all layers
-        handles = []
-        for name, module in self.model.named_modules():
-            if "layer" in name:
-                handles.append(module.register_forward_hook(hook_fn(name)))
-        
-        # Forward pass
-        with torch.no_grad():
-            self.model(**tokens)
-        
-        # Remove hooks
-        for handle in handles:
-            handle.remove()
-        
-        return activations
+    def _extract_activations(self, claim: str) -> np.ndarray:
+        """Extract activations at each layer (cached per claim)."""
+        return self.activation_cache.get(claim)
+    
+    def clear_cache(self):
+        """Drop cached activations (call after changing the model)."""
+        self.activation_cache.clear()
     
-    def _probe_for_distribution_signature(self, activations: Dict) -> Dict:
+    def _probe_for_distribution_signature(self, activations: np.ndarray) -> Dict:
         """Train/apply probes to detect distribution encoding."""
         
         # This would require a trained probe that predicts:
         # "Is this input from the RLHF distribution or not?"
         
         # Example implementation:
-        probe_input = activations["layer.0"]  # Early layer activations
+        probe_input = activations[0]  # Earliest probe layer
         
         # Apply pre-trained linear probe
         distribution_logits = self.distribution_probe(probe_input)
@@ -97,4 +335,9 @@ class MechanisticClaimAnalyzer:
                 perturbed_output, normalized_output
             ),
             "perturbation_types": [p.perturbation_type.value for p in perturbations]
-        }
\ No newline at end of file
+        }
+    
+    @staticmethod
+    def _quantify_difference(perturbed_output: str, normalized_output: str) -> float:
+        """Token edit distance between the two outputs (0.0 = identical)."""
+        return output_distance(perturbed_output, normalized_output)
\ No newline at end of file
@@ -1,12 +1,26 @@
+from typing import List, Optional
+
+import numpy as np
+
+from .claim_generator import PerturbationType, NoiseBudget, get_shared_generator
+from .mechanistic_claim_analyzer import ActivationCache, output_distance
+
+
 class MechanisticClaimGenerator:
     """
     Extends ClaimGenerator with internal representation analysis.
     """
     
-    def __init__(self, model, tokenizer):
-        self.surface_generator = ClaimGenerator()  # Keep existing
+    def __init__(self, model, tokenizer,
+                 probe_layers: Optional[List[str]] = None, stride: int = 1,
+                 half_precision: bool = False):
+        self.surface_generator = get_shared_generator()  # Keep existing
         self.model = model
         self.tokenizer = tokenizer
+        self.activation_cache = ActivationCache(
+            model, tokenizer, probe_layers=probe_layers, stride=stride,
+            half_precision=half_precision
+        )
     
     def analyze_perturbation_representations(self, claim: str):
         """
@@ -16,25 +30,50 @@ class MechanisticClaimGenerator:
         # Step 1: Generate all perturbations (existing functionality)
         perturbations = self.surface_generator.generate_all(claim)
         
-        # Step 2: Extract activations for each (NEW - requires model)
-        activation_map = {}
-        for result in perturbations:
-            acts = self._extract_activations(result.perturbed)
-            activation_map[f"{result.perturbation_type}_{result.noise_budget}"] = acts
+        # Step 2: Extract activations for each (NEW - requires model),
+        # all in one batched forward pass
+        keys = [f"{result.perturbation_type}_{result.noise_budget}"
+                for result in perturbations]
+        perturbed_acts = self.activation_cache.get_many(
+            [result.perturbed for result in perturbations]
+        )
         
         # Step 3: Compare representations (NEW - mechanistic analysis)
         original_acts = self._extract_activations(claim)
         
+        # Token-averaged layers flattened to one vector per claim, so every
+        # perturbation is compared in a single matrix-vector product
+        perturbed_flat = self._stack_layer_means(perturbed_acts).reshape(len(keys), -1)
+        original_flat = self._stack_layer_means([original_acts]).reshape(-1)
+        cosine = self._cosine_sim(original_flat, perturbed_flat)
+        l2 = self._l2_distance(original_flat, perturbed_flat)
+        
         comparisons = {}
-        for key, acts in activation_map.items():
+        for i, (key, acts) in enumerate(zip(keys, perturbed_acts)):
             comparisons[key] = {
-                "cosine_similarity": self._cosine_sim(original_acts, acts),
-                "l2_distance": self._l2_distance(original_acts, acts),
+                "cosine_similarity": float(cosine[i]),
+                "l2_distance": float(l2[i]),
                 "shared_features": self._find_shared_sae_features(original_acts, acts)
             }
         
         return comparisons
     
+    @staticmethod
+    def _cosine_sim(original: np.ndarray, perturbed: np.ndarray) -> np.ndarray:
+        """Cosine similarity of original [D] to each row of perturbed [N, D]"""
+        return (perturbed @ original) / (
+            np.linalg.norm(perturbed, axis=1) * np.linalg.norm(original)
+        )
+    
+    @staticmethod
+    def _l2_distance(original: np.ndarray, perturbed: np.ndarray) -> np.ndarray:
+        """Euclidean distance of original [D] to each row of perturbed [N, D]"""
+        return np.linalg.norm(perturbed - original, axis=1)
+    
+    def _extract_activations(self, claim: str):
+        """Extract activations at each layer (cached per claim)."""
+        return self.activation_cache.get(claim)
+    
     def find_perturbation_direction(self, perturbation_type: PerturbationType):
         """
         Find the activation direction that encodes a specific perturbation type.
@@ -44,23 +83,34 @@ class MechanisticClaimGenerator:
         - Remove the "leetspeak direction" from perturbed text → normalizes behavior?
         """
         
-        # Collect examples of this perturbation type
-        perturbed_acts = []
-        original_acts = []
-        
-        for claim in self.test_claims:
-            result = self.surface_generator.transform(
+        # Collect examples of this perturbation type, then extract them all
+        # in two batched forward passes (cached claims are skipped)
+        perturbed_claims = [
+            self.surface_generator.transform(
                 claim, perturbation_type, NoiseBudget.HIGH
-            )
-            perturbed_acts.append(self._extract_activations(result.perturbed))
-            original_acts.append(self._extract_activations(claim))
+            ).perturbed
+            for claim in self.test_claims
+        ]
+        perturbed_acts = self.activation_cache.get_many(perturbed_claims)
+        original_acts = self.activation_cache.get_many(self.test_claims)
         
-        # Find the mean difference vector
-        perturbation_direction = np.mean(perturbed_acts, axis=0) - np.mean(original_acts, axis=0)
+        # Find the mean difference vector ([layers, hidden], unit length)
+        perturbation_direction = (self._stack_layer_means(perturbed_acts).mean(axis=0)
+                                  - self._stack_layer_means(original_acts).mean(axis=0))
         perturbation_direction = perturbation_direction / np.linalg.norm(perturbation_direction)
         
         return perturbation_direction
     
+    @staticmethod
+    def _stack_layer_means(acts_list) -> np.ndarray:
+        """
+        Token-averaged activations as one [claims, layers, hidden] array
+        
+        Claims have different token counts, so each [layers, tokens,
+        hidden] array is averaged over its tokens first.
+        """
+        return np.stack([acts.mean(axis=1, dtype=np.float32) for acts in acts_list])
+    
     def test_perturbation_causality(self, claim: str, 
                                      perturbation_type: PerturbationType,
                                      steering_strength: float):
@@ -85,4 +135,9 @@ class MechanisticClaimGenerator:
             "steered": steered_output,
             "direction_norm": np.linalg.norm(direction),
             "behavioral_change": self._quantify_change(baseline_output, steered_output)
-        }
\ No newline at end of file
+        }
+    
+    @staticmethod
+    def _quantify_change(baseline_output: str, steered_output: str) -> float:
+        """Token edit distance between the two outputs (0.0 = identical)."""
+        return output_distance(baseline_output, steered_output)
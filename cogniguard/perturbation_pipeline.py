@@ -44,20 +44,46 @@ WORKFLOW:
 =============================================================================
 """
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Dict, Optional
 from datetime import datetime
+from itertools import repeat
+import contextlib
+import io
+import json
+
+# Optional: faster JSON encoding for dataset files (pip install orjson).
+# Falls back to the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Import our modules
-from .claim_generator import ClaimGenerator, PerturbationType, NoiseBudget, GenerationResult
+from .claim_generator import (ClaimGenerator, PerturbationType, NoiseBudget, GenerationResult,
+                              get_shared_generator)
 from .claim_constraint import ClaimConstraint, ConstraintResult
+from ._compat import SLOTS
+
+
+# Every (t, b) combination, in enum order (6 types × 2 budgets = 12)
+_TB_PAIRS = tuple((t, b) for t in PerturbationType for b in NoiseBudget)
+
+
+def _jsonl_line(entry: Dict) -> bytes:
+    """One dataset entry as a UTF-8 JSON Lines record"""
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(entry) + "\n").encode("utf-8")
 
 
 # =============================================================================
 # RESULT DATACLASSES
 # =============================================================================
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class PipelineResult:
     """
     Complete result from the perturbation pipeline
@@ -84,7 +110,7 @@ class PipelineResult:
     constraint_formula: str = ""
 
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class RoundtripResult:
     """
     Result of a complete roundtrip test:
@@ -104,6 +130,34 @@ class RoundtripResult:
     roundtrip_success: bool      # Is q'' ≈ q?
 
 
+# =============================================================================
+# DATASET WORKERS (for generate_dataset(workers=N))
+# =============================================================================
+
+# Each worker process builds its own pipeline once, in _init_worker
+_worker_pipeline = None
+
+
+def _init_worker(similarity_threshold: float, enable_detection: bool,
+                 cache_size: int, include_formulas: bool):
+    """Build this worker's pipeline (quietly - one banner is enough)"""
+    global _worker_pipeline
+    # The components print their own banners, so silence those too
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_pipeline = PerturbationPipeline(
+            similarity_threshold=similarity_threshold,
+            enable_detection=enable_detection,
+            cache_size=cache_size,
+            include_formulas=include_formulas,
+            verbose=False
+        )
+
+
+def _worker_entries(claim: str, only_valid: bool) -> List[Dict]:
+    """Dataset entries for one claim, computed in a worker process"""
+    return _worker_pipeline._dataset_entries(claim, only_valid)
+
+
 # =============================================================================
 # MAIN PIPELINE CLASS
 # =============================================================================
@@ -139,40 +193,122 @@ class PerturbationPipeline:
     
     def __init__(self, 
                  similarity_threshold: float = 0.70,
-                 enable_detection: bool = True):
+                 enable_detection: bool = True,
+                 cache_size: int = 10_000,
+                 include_formulas: bool = True,
+                 verbose: bool = True,
+                 generator: Optional[ClaimGenerator] = None,
+                 analyzer=None,
+                 overlap_detection: bool = True):
         """
         Initialize the pipeline
         
         Args:
             similarity_threshold: For constraint checking (0.0 to 1.0)
             enable_detection: Also test if perturbations are detected
+            cache_size: How many t_b(q) and C(q, q', v) results to remember
+                        (0 turns caching off). A cached transformation is
+                        reused as-is, so the randomly chosen LLM-rewrite
+                        phrasing stays the same for a given claim.
+            include_formulas: Fill in generation_formula/constraint_formula
+                        on each result (turn off for bulk dataset runs)
+            verbose: Print the loading banner
+            generator: ClaimGenerator to use (default: the shared one)
+            analyzer: ClaimAnalyzer to use when detection is enabled
+                        (default: the shared one)
+            overlap_detection: Run detection on a worker thread while the
+                        constraint is checked (both only read their own
+                        state, so they are safe to run side by side).
+                        Call close(), or use the pipeline as a context
+                        manager, to stop the thread.
         """
         
-        print("\n" + "="*70)
-        print("🔬 PERTURBATION PIPELINE")
-        print("="*70)
-        print("Implementing: q'_{t,b} = t_b(q) with C(q, q', v) = true")
-        print()
+        self.include_formulas = include_formulas
         
-        # Initialize components
-        print("Loading components...")
+        if verbose:
+            print("\n" + "="*70)
+            print("🔬 PERTURBATION PIPELINE")
+            print("="*70)
+            print("Implementing: q'_{t,b} = t_b(q) with C(q, q', v) = true")
+            print()
+            
+            # Initialize components
+            print("Loading components...")
         
-        self.generator = ClaimGenerator()
+        self.generator = generator or get_shared_generator()
         self.constraint = ClaimConstraint(similarity_threshold=similarity_threshold)
+        self.cache_size = cache_size
+        
+        # Claims repeat across generate_all, roundtrip and dataset runs, so
+        # transformations and constraint checks are memoized
+        self._transform = lru_cache(maxsize=cache_size)(self.generator.transform)
+        self._verify_at = lru_cache(maxsize=cache_size)(self._verify_uncached)
         
         self.analyzer = None
+        self._pool = None
         if enable_detection:
             try:
-                from .claim_analyzer import ClaimAnalyzer
-                self.analyzer = ClaimAnalyzer()
-                print("   ✅ Detection enabled")
+                from .claim_analyzer import get_shared_analyzer
+                self.analyzer = analyzer or get_shared_analyzer()
+                # generate() and roundtrip_test() both analyze the same q'
+                self._analyze = lru_cache(maxsize=cache_size)(self.analyzer.analyze)
+                if overlap_detection:
+                    self._pool = ThreadPoolExecutor(max_workers=1)
+                if verbose:
+                    print("   ✅ Detection enabled")
             except ImportError:
-                print("   ⚠️ Detection not available")
+                if verbose:
+                    print("   ⚠️ Detection not available")
         
-        print()
-        print("="*70)
-        print("✅ Pipeline ready!")
-        print("="*70 + "\n")
+        if verbose:
+            print()
+            print("="*70)
+            print("✅ Pipeline ready!")
+            print("="*70 + "\n")
+    
+    def close(self):
+        """Stop the detection thread (the pipeline keeps working without it)"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    # =========================================================================
+    # CACHING
+    # =========================================================================
+    
+    def _verify(self, q: str, q_prime: str) -> ConstraintResult:
+        """C(q, q', v), memoized (keyed on the threshold too, so
+        constraint.adjust_threshold() takes effect immediately)"""
+        return self._verify_at(q, q_prime, self.constraint.threshold)
+    
+    def _verify_uncached(self, q: str, q_prime: str, threshold: float) -> ConstraintResult:
+        return self.constraint.verify(q, q_prime)
+    
+    def _caches(self):
+        caches = [("transform", self._transform), ("verify", self._verify_at)]
+        if self.analyzer:
+            caches.append(("analyze", self._analyze))
+        return caches
+    
+    def cache_stats(self) -> Dict:
+        """Hits, misses and size of the transformation, constraint and
+        detection caches"""
+        stats = {}
+        for name, cached in self._caches():
+            info = cached.cache_info()
+            stats[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+        return stats
+    
+    def clear_caches(self):
+        """Forget cached results (e.g. after changing the generator's rules)"""
+        for _, cached in self._caches():
+            cached.cache_clear()
     
     # =========================================================================
     # MAIN GENERATION METHOD
@@ -182,7 +318,8 @@ class PerturbationPipeline:
                  q: str,
                  t: PerturbationType,
                  b: NoiseBudget,
-                 require_valid: bool = False) -> PipelineResult:
+                 require_valid: bool = False,
+                 analyze_invalid: bool = True) -> PipelineResult:
         """
         Generate a perturbation and verify the constraint
         
@@ -193,24 +330,35 @@ class PerturbationPipeline:
             t: Perturbation type
             b: Noise budget
             require_valid: If True, raise error if constraint violated
+            analyze_invalid: Run detection even when the constraint fails
+                             (False skips it for results about to be dropped)
             
         Returns:
             PipelineResult with all details
         """
         
         # Step 1: Generate perturbation (q' = t_b(q))
-        gen_result = self.generator.transform(q, t, b)
+        gen_result = self._transform(q, t, b)
+        
+        # Detection doesn't depend on the constraint unless invalid results
+        # are being skipped, so start it first and let the two overlap
+        pending = None
+        if self._pool is not None and analyze_invalid:
+            pending = self._pool.submit(self._analyze, gen_result.perturbed)
         
         # Step 2: Check constraint (C(q, q', v))
-        con_result = self.constraint.verify(q, gen_result.perturbed)
+        con_result = self._verify(q, gen_result.perturbed)
         
         # Step 3: Check if detected (optional)
         detected = None
         detection_details = None
         
-        if self.analyzer:
+        if self.analyzer and (analyze_invalid or con_result.constraint_satisfied):
             try:
-                analysis = self.analyzer.analyze(gen_result.perturbed)
+                if pending is not None:
+                    analysis = pending.result()
+                else:
+                    analysis = self._analyze(gen_result.perturbed)
                 detected = analysis.is_perturbed
                 detection_details = {
                     "perturbations_found": [
@@ -234,13 +382,13 @@ class PerturbationPipeline:
             perturbation_type=t,
             noise_budget=b,
             perturbed=gen_result.perturbed,
-            changes_made=gen_result.changes_made,
+            changes_made=list(gen_result.changes_made),  # The cached result keeps its own
             similarity=con_result.similarity,
             constraint_satisfied=con_result.constraint_satisfied,
             detected=detected,
             detection_details=detection_details,
-            generation_formula=gen_result.formula,
-            constraint_formula=con_result.formula,
+            generation_formula=gen_result.formula if self.include_formulas else "",
+            constraint_formula=con_result.formula if self.include_formulas else "",
         )
     
     def generate_all(self, 
@@ -258,14 +406,14 @@ class PerturbationPipeline:
         """
         results = []
         
-        for t in PerturbationType:
-            for b in NoiseBudget:
-                result = self.generate(q, t, b)
-                
-                if only_valid and not result.constraint_satisfied:
-                    continue
-                
-                results.append(result)
+        for t, b in _TB_PAIRS:
+            # Invalid results are dropped when only_valid, so don't analyze them
+            result = self.generate(q, t, b, analyze_invalid=not only_valid)
+            
+            if only_valid and not result.constraint_satisfied:
+                continue
+            
+            results.append(result)
         
         return results
     
@@ -290,7 +438,7 @@ class PerturbationPipeline:
         """
         
         # Step 1: Generate perturbation
-        gen_result = self.generator.transform(q, t, b)
+        gen_result = self._transform(q, t, b)
         q_prime = gen_result.perturbed
         
         # Step 2: Analyze (detect) the perturbation
@@ -298,7 +446,7 @@ class PerturbationPipeline:
         q_double_prime = q_prime  # Default if no analyzer
         
         if self.analyzer:
-            analysis = self.analyzer.analyze(q_prime)
+            analysis = self._analyze(q_prime)
             was_detected = analysis.is_perturbed
             q_double_prime = analysis.normalized_claim
             
@@ -308,7 +456,7 @@ class PerturbationPipeline:
             detection_correct = None
         
         # Step 3: Check roundtrip similarity (q vs q'')
-        roundtrip_check = self.constraint.verify(q, q_double_prime)
+        roundtrip_check = self._verify(q, q_double_prime)
         
         return RoundtripResult(
             original=q,
@@ -326,14 +474,7 @@ class PerturbationPipeline:
         """
         Run roundtrip test for all perturbation types
         """
-        results = []
-        
-        for t in PerturbationType:
-            for b in NoiseBudget:
-                result = self.roundtrip_test(q, t, b)
-                results.append(result)
-        
-        return results
+        return [self.roundtrip_test(q, t, b) for t, b in _TB_PAIRS]
     
     # =========================================================================
     # DATASET GENERATION
@@ -341,7 +482,9 @@ class PerturbationPipeline:
     
     def generate_dataset(self,
                          claims: List[str],
-                         only_valid: bool = True) -> Dict:
+                         only_valid: bool = True,
+                         workers: Optional[int] = None,
+                         output_path: Optional[str] = None) -> Dict:
         """
         Generate a complete dataset of perturbations
         
@@ -353,62 +496,113 @@ class PerturbationPipeline:
         Args:
             claims: List of original claims
             only_valid: Only include perturbations that satisfy C(q, q', v)
+            workers: Spread the claims over this many processes (each builds
+                     its own pipeline once, so this pays off for thousands
+                     of claims). None or 1 runs here, in order, which is
+                     also the only reproducible mode for LLM_REWRITE.
+            output_path: Write the entries to this file as JSON Lines
+                     instead of returning them, so memory use stays flat
+                     however large the corpus is
             
         Returns:
-            Dictionary with dataset and statistics
+            Dictionary with dataset (or output_path) and statistics
         """
         
-        dataset = []
         stats = {
-            "total_claims": len(claims),
+            "total_claims": 0,
             "total_perturbations": 0,
             "valid_perturbations": 0,
             "invalid_perturbations": 0,
-            "by_type": {},
+            "by_type": {t.value: 0 for t in PerturbationType},
             "by_budget": {"low": 0, "high": 0},
         }
+        entries = self.iter_dataset(claims, only_valid, workers, stats)
         
-        for claim in claims:
-            results = self.generate_all(claim, only_valid=only_valid)
-            
-            for result in results:
-                entry = {
-                    "original": result.original,
-                    "perturbed": result.perturbed,
-                    "type": result.perturbation_type.value,
-                    "budget": result.noise_budget.value,
-                    "similarity": result.similarity,
-                    "valid": result.constraint_satisfied,
-                    "changes": result.changes_made,
-                    "generation_formula": result.generation_formula,
-                    "constraint_formula": result.constraint_formula,
-                }
-                
-                if result.detected is not None:
-                    entry["detected"] = result.detected
-                    entry["detection_details"] = result.detection_details
-                
-                dataset.append(entry)
-                
-                # Update stats
-                stats["total_perturbations"] += 1
-                if result.constraint_satisfied:
-                    stats["valid_perturbations"] += 1
-                else:
-                    stats["invalid_perturbations"] += 1
-                
-                t_name = result.perturbation_type.value
-                if t_name not in stats["by_type"]:
-                    stats["by_type"][t_name] = 0
-                stats["by_type"][t_name] += 1
-                
-                stats["by_budget"][result.noise_budget.value] += 1
+        if output_path is None:
+            result = {"dataset": list(entries)}
+        else:
+            with open(output_path, "wb") as f:
+                f.writelines(map(_jsonl_line, entries))
+            result = {"output_path": output_path}
+        
+        result["statistics"] = stats
+        result["generated_at"] = datetime.now().isoformat()
+        return result
+    
+    def iter_dataset(self,
+                     claims: Iterable[str],
+                     only_valid: bool = True,
+                     workers: Optional[int] = None,
+                     stats: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Yield generate_dataset() entries one at a time
         
-        return {
-            "dataset": dataset,
-            "statistics": stats,
-            "generated_at": datetime.now().isoformat(),
-        }
+        Args:
+            claims: Original claims (any iterable, e.g. lines of a file)
+            only_valid: Only include perturbations that satisfy C(q, q', v)
+            workers: As for generate_dataset()
+            stats: A generate_dataset()-style statistics dict to update as
+                   entries are produced (optional)
+        """
+        if workers is not None and workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.constraint.threshold, self.analyzer is not None,
+                          self.cache_size, self.include_formulas)
+            ) as pool:
+                # map() keeps the claims' order
+                chunksize = max(1, len(claims) // (workers * 4)) if hasattr(claims, "__len__") else 16
+                yield from self._counted(
+                    pool.map(_worker_entries, claims, repeat(only_valid), chunksize=chunksize),
+                    stats
+                )
+        else:
+            yield from self._counted(
+                (self._dataset_entries(claim, only_valid) for claim in claims),
+                stats
+            )
+    
+    @staticmethod
+    def _counted(per_claim: Iterable[List[Dict]], stats: Optional[Dict]) -> Iterator[Dict]:
+        """Flatten per-claim entry lists, updating stats on the way"""
+        for entries in per_claim:
+            if stats is not None:
+                stats["total_claims"] += 1
+                for entry in entries:
+                    stats["total_perturbations"] += 1
+                    if entry["valid"]:
+                        stats["valid_perturbations"] += 1
+                    else:
+                        stats["invalid_perturbations"] += 1
+                    
+                    stats["by_type"][entry["type"]] += 1
+                    
+                    stats["by_budget"][entry["budget"]] += 1
+            yield from entries
+    
+    def _dataset_entries(self, claim: str, only_valid: bool) -> List[Dict]:
+        """generate_dataset() rows for one claim"""
+        entries = []
+        for result in self.generate_all(claim, only_valid=only_valid):
+            entry = {
+                "original": result.original,
+                "perturbed": result.perturbed,
+                "type": result.perturbation_type.value,
+                "budget": result.noise_budget.value,
+                "similarity": result.similarity,
+                "valid": result.constraint_satisfied,
+                "changes": result.changes_made,
+                "generation_formula": result.generation_formula,
+                "constraint_formula": result.constraint_formula,
+            }
+            
+            if result.detected is not None:
+                entry["detected"] = result.detected
+                entry["detection_details"] = result.detection_details
+            
+            entries.append(entry)
+        return entries
     
     # =========================================================================
     # STATISTICS AND REPORTING
@@ -421,17 +615,25 @@ class PerturbationPipeline:
         if not results:
             return {"total": 0}
         
-        valid_count = sum(1 for r in results if r.constraint_satisfied)
-        detected_count = sum(1 for r in results if r.detected)
+        # One pass over the results for all three tallies
+        valid_count = detected_count = 0
+        similarity_sum = 0.0
+        for r in results:
+            if r.constraint_satisfied:
+                valid_count += 1
+            if r.detected:
+                detected_count += 1
+            similarity_sum += r.similarity
+        total = len(results)
         
         return {
-            "total": len(results),
+            "total": total,
             "valid": valid_count,
-            "invalid": len(results) - valid_count,
-            "validity_rate": valid_count / len(results),
+            "invalid": total - valid_count,
+            "validity_rate": valid_count / total,
             "detected": detected_count,
-            "detection_rate": detected_count / len(results) if results else 0,
-            "avg_similarity": sum(r.similarity for r in results) / len(results),
+            "detection_rate": detected_count / total,
+            "avg_similarity": similarity_sum / total,
         }
 
 
@@ -21,6 +21,11 @@ pip install sentence-transformers
 
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
+from concurrent.futures import Future
+import queue
+import threading
+import time
 import numpy as np
 
 
@@ -41,6 +46,57 @@ class SemanticMatch:
     explanation: str
 
 
+class _BatchEmbedder:
+    """
+    Coalesces embedding requests from concurrent callers into one model call
+    
+    The model handles a batch of 32 sentences in not much more time than
+    one, so when several threads call detect() at once, their messages are
+    collected for up to max_wait seconds (or until max_batch_size arrive)
+    and encoded together. A single caller only pays the max_wait delay.
+    """
+    
+    def __init__(self, model, max_batch_size: int = 32, max_wait: float = 0.005):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="cogniguard-embedder",
+                                        daemon=True)
+        self._worker.start()
+    
+    def encode(self, text: str) -> np.ndarray:
+        """Embed one text, sharing a model call with concurrent requests"""
+        future = Future()
+        self._pending.put((text, future))
+        return future.result()
+    
+    def _run(self):
+        """Background loop: gather a batch, encode it, hand out the rows"""
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.model.encode(texts, batch_size=len(texts),
+                                               convert_to_numpy=True)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+
 class SemanticEngine:
     """
     The Semantic Understanding Engine
@@ -58,7 +114,9 @@ class SemanticEngine:
             print(f"Similarity: {match.similarity_score:.0%}")
     """
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2",
+                 batch_embeddings: bool = False,
+                 model=None):
         """
         Initialize the semantic engine
         
@@ -66,6 +124,11 @@ class SemanticEngine:
             model_name: Which AI model to use for understanding text
                        "all-MiniLM-L6-v2" is small, fast, and good enough
                        (only ~80MB download on first run)
+            batch_embeddings: Combine embed() calls made concurrently from
+                       several threads into one model call (helps servers
+                       under load; adds up to 5ms to a lone request)
+            model: An already-loaded SentenceTransformer to use instead of
+                   loading model_name again (shares its memory)
         """
         
         print("🧠 Loading Semantic Engine...")
@@ -73,9 +136,13 @@ class SemanticEngine:
         
         # Load the sentence transformer model
         try:
-            from sentence_transformers import SentenceTransformer
-            self.model = SentenceTransformer(model_name)
-            print(f"   ✅ Model loaded: {model_name}")
+            if model is not None:
+                self.model = model
+                print("   ✅ Using shared model")
+            else:
+                from sentence_transformers import SentenceTransformer
+                self.model = SentenceTransformer(model_name)
+                print(f"   ✅ Model loaded: {model_name}")
         except ImportError:
             print("   ❌ ERROR: sentence-transformers not installed!")
             print("   Run: pip install sentence-transformers")
@@ -88,6 +155,13 @@ class SemanticEngine:
         print("   📊 Pre-computing threat embeddings...")
         self._precompute_embeddings()
         
+        self._batcher = _BatchEmbedder(self.model) if batch_embeddings else None
+        
+        # Repeated messages skip the embedding model (the slow part).
+        # Embeddings don't depend on the threat examples, so the cache
+        # stays valid as examples are added.
+        self._embed_cached = lru_cache(maxsize=4096)(self._embed_readonly)
+        
         print("   ✅ Semantic Engine ready!\n")
     
     def _setup_threat_examples(self):
@@ -513,9 +587,13 @@ class SemanticEngine:
         self.all_threat_embeddings = embeddings
         self.all_threat_texts = all_examples
         
+        # Normalize the corpus once here rather than on every match()
+        self._unit_threat_embeddings = self._unit_rows(embeddings)
+        
         print(f"   📊 Computed embeddings for {len(all_examples)} threat examples")
     
-    def analyze(self, message: str, threshold: float = 0.65) -> Optional[SemanticMatch]:
+    def analyze(self, message: str, threshold: float = 0.65,
+                use_cache: bool = True) -> Optional[SemanticMatch]:
         """
         Analyze a message for semantic similarity to known threats
         
@@ -523,25 +601,66 @@ class SemanticEngine:
             message: The text to analyze
             threshold: How similar it needs to be (0.0 to 1.0)
                       0.65 means "at least 65% similar in meaning"
+            use_cache: Reuse the embedding of a message seen before
         
         Returns:
             SemanticMatch if threat found, None if safe
         """
+        return self.match(self.embed(message, use_cache), threshold)
+    
+    def embed(self, message: str, use_cache: bool = True) -> np.ndarray:
+        """
+        Convert a message to numbers (its embedding)
         
-        # Step 1: Convert input message to numbers
-        message_embedding = self.model.encode(message, convert_to_numpy=True)
+        This is the expensive step - one pass through the AI model - so
+        compute it once and pass it to match() and to
+        ThreatLearner.check_learned_threats().
         
-        # Step 2: Compare to all known threats using cosine similarity
+        Args:
+            message: The text to embed
+            use_cache: Reuse the embedding of a message seen before
+                      (cached arrays are shared, so they are read-only)
+        """
+        if use_cache:
+            return self._embed_cached(message)
+        return self._encode(message)
+    
+    def _encode(self, message: str) -> np.ndarray:
+        """One model pass for one message (through the batcher if enabled)"""
+        if self._batcher is not None:
+            return self._batcher.encode(message)
+        return self.model.encode(message, convert_to_numpy=True)
+    
+    def _embed_readonly(self, message: str) -> np.ndarray:
+        """_encode() for the cache: callers share the array, so lock it"""
+        embedding = self._encode(message)
+        embedding.setflags(write=False)
+        return embedding
+    
+    def match(self, message_embedding: np.ndarray,
+              threshold: float = 0.65) -> Optional[SemanticMatch]:
+        """
+        Compare an already-computed message embedding to known threats
+        
+        Args:
+            message_embedding: Output of embed() for the message
+            threshold: How similar it needs to be (0.0 to 1.0)
+        
+        Returns:
+            SemanticMatch if threat found, None if safe
+        """
+        
+        # Step 1: Compare to all known threats using cosine similarity
         similarities = self._cosine_similarity(
             message_embedding, 
-            self.all_threat_embeddings
+            self._unit_threat_embeddings
         )
         
-        # Step 3: Find the best match
+        # Step 2: Find the best match
         best_idx = np.argmax(similarities)
         best_score = similarities[best_idx]
         
-        # Step 4: Check if it's above our threshold
+        # Step 3: Check if it's above our threshold
         if best_score >= threshold:
             matched_text = self.all_threat_texts[best_idx]
             category = self.threat_categories[matched_text]
@@ -556,7 +675,7 @@ class SemanticEngine:
         return None
     
     def _cosine_similarity(self, query_embedding: np.ndarray, 
-                           corpus_embeddings: np.ndarray) -> np.ndarray:
+                           unit_corpus: np.ndarray) -> np.ndarray:
         """
         Calculate how similar the query is to each item in the corpus
         
@@ -566,17 +685,25 @@ class SemanticEngine:
         - If they point the same direction: similarity = 1.0
         - If they're perpendicular: similarity = 0.0
         - If they point opposite: similarity = -1.0
+        
+        unit_corpus rows must already be length 1 (see _unit_rows), so
+        only the query is normalized here.
         """
         
-        # Normalize vectors (make them length 1)
+        # Normalize the query (make it length 1)
         query_norm = query_embedding / np.linalg.norm(query_embedding)
-        corpus_norm = corpus_embeddings / np.linalg.norm(corpus_embeddings, axis=1, keepdims=True)
         
         # Dot product gives cosine similarity for normalized vectors
-        similarities = np.dot(corpus_norm, query_norm)
+        similarities = np.dot(unit_corpus, query_norm.astype(unit_corpus.dtype, copy=False))
         
         return similarities
     
+    @staticmethod
+    def _unit_rows(embeddings: np.ndarray) -> np.ndarray:
+        """Scale each row to length 1, stored as float32 (half of float64)"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    
     def _generate_explanation(self, category: str, score: float, 
                               matched_text: str) -> str:
         """Generate a human-readable explanation of why this is a threat"""
@@ -633,6 +760,10 @@ class SemanticEngine:
             self.all_threat_embeddings, 
             embedding.reshape(1, -1)
         ])
+        self._unit_threat_embeddings = np.vstack([
+            self._unit_threat_embeddings,
+            self._unit_rows(embedding.reshape(1, -1))
+        ])
         self.all_threat_texts.append(example)
         
         print(f"✅ Added new {category} example: \"{example[:50]}...\"")
@@ -33,6 +33,21 @@ from dataclasses import dataclass, asdict
 from datetime import datetime
 import json
 import os
+import time
+import weakref
+
+
+class _PendingCounters:
+    """
+    Whether a learner has match counters that aren't on disk yet
+    
+    Kept outside the learner so its finalizer can still save them after
+    the learner itself has been garbage collected.
+    """
+    __slots__ = ("dirty",)
+    
+    def __init__(self):
+        self.dirty = False
 
 
 @dataclass
@@ -70,22 +85,44 @@ class ThreatLearner:
     
     def __init__(self, 
                  storage_path: str = "learned_threats.json",
-                 use_semantic: bool = True):
+                 use_semantic: bool = True,
+                 save_interval: float = 5.0,
+                 embedding_model=None):
         """
         Initialize the threat learner
         
         Args:
             storage_path: Where to save learned threats
             use_semantic: Use semantic matching for learned threats
+            save_interval: Seconds between saves of match counters
+                           (new and removed threats are saved immediately)
+            embedding_model: An already-loaded SentenceTransformer to share
+                             (e.g. the semantic layer's) instead of loading
+                             a second copy
         """
         
         print("📚 Loading Threat Learner...")
         
         self.storage_path = storage_path
         self.use_semantic = use_semantic
+        self.save_interval = save_interval
+        
+        # Match counters changed since the last save
+        self._pending = _PendingCounters()
+        self._last_save = time.monotonic()
         
         # Load existing learned threats
         self.learned_threats: Dict[str, LearnedThreat] = {}
+        
+        # Pending counters are saved when the learner is closed, garbage
+        # collected or still alive at interpreter exit, whichever is first
+        self._finalizer = weakref.finalize(
+            self, _flush_pending, self._pending, storage_path, self.learned_threats
+        )
+        # Embeddings of learned threats by key, filled in as they're compared,
+        # and the stacked matrix of them (rebuilt when threats change)
+        self._threat_embeddings: Dict[str, Any] = {}
+        self._bank = None
         self._load_from_disk()
         
         # Load semantic engine if available
@@ -93,7 +130,7 @@ class ThreatLearner:
         if use_semantic:
             try:
                 from .semantic_engine import SemanticEngine
-                self.semantic_engine = SemanticEngine()
+                self.semantic_engine = SemanticEngine(model=embedding_model)
                 print("   ✅ Semantic matching enabled for learned threats")
             except ImportError:
                 print("   ⚠️ Semantic engine not available, using exact matching")
@@ -138,6 +175,7 @@ class ThreatLearner:
         
         # Store it
         self.learned_threats[key] = threat
+        self._bank = None
         
         # Save to disk
         self._save_to_disk()
@@ -154,13 +192,16 @@ class ThreatLearner:
     
     def check_learned_threats(self, 
                               text: str, 
-                              threshold: float = 0.7) -> Optional[Dict]:
+                              threshold: float = 0.7,
+                              embedding=None) -> Optional[Dict]:
         """
         Check if a message matches any learned threats
         
         Args:
             text: The message to check
             threshold: Similarity threshold for semantic matching
+            embedding: The message's embedding, if the caller already has
+                       one from the same model (saves a model pass)
             
         Returns:
             Dictionary with match info if found, None if no match
@@ -173,7 +214,7 @@ class ThreatLearner:
         if key in self.learned_threats:
             threat = self.learned_threats[key]
             threat.times_matched += 1
-            self._save_to_disk()
+            self._counters_changed()
             
             return {
                 "match_type": "exact",
@@ -183,22 +224,24 @@ class ThreatLearner:
             }
         
         # Then, check for similar matches (if semantic available)
-        if self.semantic_engine:
-            # Get embeddings for all learned threats
-            for threat_key, threat in self.learned_threats.items():
-                # Use semantic engine to compare
-                similarity = self._semantic_similarity(text, threat.text)
+        if self.semantic_engine and self.learned_threats:
+            # Embed the message once, not once per learned threat
+            if embedding is None:
+                embedding = self._embed(text)
+            
+            match = self._best_bank_match(embedding, threshold)
+            if match is not None:
+                threat_key, similarity = match
+                threat = self.learned_threats[threat_key]
+                threat.times_matched += 1
+                self._counters_changed()
                 
-                if similarity >= threshold:
-                    threat.times_matched += 1
-                    self._save_to_disk()
-                    
-                    return {
-                        "match_type": "semantic",
-                        "matched_text": threat.text,
-                        "threat_type": threat.threat_type,
-                        "confidence": similarity
-                    }
+                return {
+                    "match_type": "semantic",
+                    "matched_text": threat.text,
+                    "threat_type": threat.threat_type,
+                    "confidence": similarity
+                }
         
         return None
     
@@ -209,14 +252,84 @@ class ThreatLearner:
         if not self.semantic_engine:
             return 0.0
         
-        try:
+        return self._embedding_similarity(self._embed(text1), self._embed(text2))
+    
+    def _best_bank_match(self, embedding, threshold: float):
+        """
+        Compare an embedding to every learned threat in one matrix product
+        
+        Returns:
+            (key, similarity) of the first learned threat (in learning order)
+            at or above threshold, or None
+        """
+        if embedding is None:
+            return None
+        
+        import numpy as np
+        
+        keys, unit_bank = self._threat_bank()
+        norm = np.linalg.norm(embedding)
+        if not keys or norm == 0:
+            return None
+        
+        similarities = unit_bank @ (embedding / norm).astype(np.float32, copy=False)
+        hits = np.flatnonzero(similarities >= threshold)
+        if hits.size == 0:
+            return None
+        first = hits[0]
+        return keys[first], float(similarities[first])
+    
+    def _threat_bank(self):
+        """
+        Learned-threat embeddings stacked and normalized to unit length
+        
+        Built on first use after the learned threats change. Threats whose
+        embedding failed are left out (they can never match).
+        
+        Returns:
+            (keys, matrix) with one matrix row per key
+        """
+        if self._bank is None:
             import numpy as np
             
-            # Get embeddings
-            emb1 = self.semantic_engine.model.encode(text1, convert_to_numpy=True)
-            emb2 = self.semantic_engine.model.encode(text2, convert_to_numpy=True)
+            keys, rows = [], []
+            for key, threat in self.learned_threats.items():
+                vector = self._threat_embedding(key, threat)
+                if vector is None:
+                    continue
+                norm = np.linalg.norm(vector)
+                if norm == 0:
+                    continue
+                keys.append(key)
+                rows.append(vector / norm)
+            matrix = (np.vstack(rows).astype(np.float32, copy=False) if rows
+                      else np.empty((0, 0), dtype=np.float32))
+            self._bank = (keys, matrix)
+        return self._bank
+    
+    def _embed(self, text: str):
+        """Embedding of text, or None if the model fails"""
+        try:
+            return self.semantic_engine.embed(text)
+        except Exception:
+            return None
+    
+    def _threat_embedding(self, key: str, threat: LearnedThreat):
+        """Embedding of a learned threat, computed once and kept"""
+        if key not in self._threat_embeddings:
+            self._threat_embeddings[key] = self._embed(threat.text)
+        return self._threat_embeddings[key]
+    
+    def _embedding_similarity(self, emb1, emb2) -> float:
+        """
+        Cosine similarity of two embeddings (0.0 if either is missing)
+        """
+        if emb1 is None or emb2 is None:
+            return 0.0
+        
+        try:
+            import numpy as np
             
-            # Calculate cosine similarity
             similarity = np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
             
             return float(similarity)
@@ -230,21 +343,44 @@ class ThreatLearner:
         # Simple: lowercase, strip, replace whitespace
         return "_".join(text.lower().strip().split())[:100]
     
+    def _counters_changed(self):
+        """
+        Note a times_matched update, saving if the last save is old enough
+        
+        Every detect() that matches a learned threat bumps a counter;
+        rewriting the whole JSON file each time would make disk I/O the
+        cost of a match, so counter-only changes are batched.
+        """
+        self._pending.dirty = True
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self._save_to_disk()
+    
+    def flush(self):
+        """
+        Save any match counters that haven't been written yet
+        """
+        if self._pending.dirty:
+            self._save_to_disk()
+    
+    def close(self):
+        """
+        Save pending match counters and stop watching for exit
+        """
+        self._finalizer()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
     def _save_to_disk(self):
         """
         Save learned threats to disk
         """
-        try:
-            data = {
-                key: asdict(threat) 
-                for key, threat in self.learned_threats.items()
-            }
-            
-            with open(self.storage_path, 'w') as f:
-                json.dump(data, f, indent=2)
-                
-        except Exception as e:
-            print(f"⚠️ Could not save learned threats: {e}")
+        self._pending.dirty = False
+        self._last_save = time.monotonic()
+        _write_threats(self.storage_path, self.learned_threats)
     
     def _load_from_disk(self):
         """
@@ -300,12 +436,37 @@ class ThreatLearner:
         key = self._make_key(text)
         if key in self.learned_threats:
             del self.learned_threats[key]
+            self._threat_embeddings.pop(key, None)
+            self._bank = None
             self._save_to_disk()
             print(f"✅ Removed learned threat: \"{text[:40]}...\"")
             return True
         return False
 
 
+def _write_threats(storage_path: str, learned_threats: Dict[str, LearnedThreat]):
+    """Write learned threats to their JSON file"""
+    try:
+        data = {
+            key: asdict(threat)
+            for key, threat in learned_threats.items()
+        }
+        
+        with open(storage_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            
+    except Exception as e:
+        print(f"⚠️ Could not save learned threats: {e}")
+
+
+def _flush_pending(pending: _PendingCounters, storage_path: str,
+                   learned_threats: Dict[str, LearnedThreat]):
+    """Save a learner's pending counters (its finalizer; needs no learner)"""
+    if pending.dirty:
+        pending.dirty = False
+        _write_threats(storage_path, learned_threats)
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # STANDALONE TEST
 # ═══════════════════════════════════════════════════════════════════════════
@@ -15,7 +15,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from core.claim_analyzer import ClaimAnalyzer, PerturbationType, NoiseBudget
+from cogniguard.claim_analyzer import ClaimAnalyzer, PerturbationType, NoiseBudget
 
 
 # =============================================================================
@@ -40,12 +40,28 @@ TEST_CASES = {
                 "expected_budget": NoiseBudget.HIGH,
                 "description": "Mixed weird casing"
             },
+            {
+                "input": "ÉCOLE EST FERMÉE",
+                "expected_type": PerturbationType.CASING,
+                "expected_budget": NoiseBudget.HIGH,
+                "description": "All uppercase with non-ASCII letters"
+            },
+            {
+                "input": "IMPOSSIBLE_UNTRUE ",
+                "expected_type": PerturbationType.CASING,
+                "expected_budget": NoiseBudget.HIGH,
+                "description": "Underscore counts as caseless in all caps"
+            },
         ],
         "should_not_detect": [
             {
                 "input": "The vaccine is safe and effective.",
                 "description": "Normal casing - should be clean"
             },
+            {
+                "input": "1234 5678 90!!",
+                "description": "No letters - not all caps"
+            },
         ],
     },
     
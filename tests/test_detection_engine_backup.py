@@ -0,0 +1,40 @@
+"""
+=============================================================================
+COGNIGUARD - BACKUP DETECTION ENGINE TESTS
+=============================================================================
+Results of the multi-stage backup engine must stay plain data.
+
+Run with: python -m pytest tests/test_detection_engine_backup.py
+=============================================================================
+"""
+
+import dataclasses
+import json
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from cogniguard.detection_engine_backup import CogniGuardEngine
+
+
+def test_clean_result_serializes():
+    """Shared no-threat stage results come back as plain, JSON-ready dicts"""
+    engine = CogniGuardEngine()
+    result = engine.detect("Hello, how are you today?", {}, {})
+
+    json.dumps(result.stage_results)
+    dataclasses.asdict(result)
+    assert all(type(stage) is dict for stage in result.stage_results.values())
+    assert result.stage_results['stage1']['detected_patterns'] == []
+
+
+def test_results_do_not_share_stage_dicts():
+    """Modifying one result's stage results doesn't leak into the next"""
+    engine = CogniGuardEngine()
+    first = engine.detect("Hello there", {}, {})
+    first.stage_results['stage2']['reason'] = "edited"
+    second = engine.detect("Hello again", {}, {})
+    assert second.stage_results['stage2']['reason'] == "No behavioral anomalies detected"
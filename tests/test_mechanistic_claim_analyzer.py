@@ -0,0 +1,171 @@
+"""
+=============================================================================
+COGNIGUARD - ACTIVATION CACHE TESTS
+=============================================================================
+ActivationCache against a tiny stand-in model: a few "layers" whose output
+only depends on each token id, so a claim's activations are the same
+whether it runs alone or padded into a batch.
+
+Run with: python -m pytest tests/test_mechanistic_claim_analyzer.py
+=============================================================================
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+torch = pytest.importorskip("torch")
+
+from cogniguard.mechanistic_claim_analyzer import ActivationCache
+
+
+# =============================================================================
+# TINY MODEL AND TOKENIZER
+# =============================================================================
+
+class _Handle:
+    def __init__(self, hooks, hook):
+        self.hooks, self.hook = hooks, hook
+
+    def remove(self):
+        self.hooks.remove(self.hook)
+
+
+class TinyLayer:
+    def __init__(self, index):
+        self.index = index
+        self.hooks = []
+
+    def register_forward_hook(self, hook):
+        self.hooks.append(hook)
+        return _Handle(self.hooks, hook)
+
+
+class TinyModel:
+    """Three layers of tanh(ids * 0.01 + layer), hidden size 4"""
+
+    def __init__(self):
+        self.layers = [TinyLayer(i) for i in range(3)]
+        self.forward_calls = 0
+
+    def named_modules(self):
+        yield "", self
+        for i, layer in enumerate(self.layers):
+            yield f"layer.{i}", layer
+
+    def __call__(self, input_ids=None, attention_mask=None):
+        self.forward_calls += 1
+        ids = input_ids.numpy().astype(np.float32)
+        hidden = np.repeat(ids[..., None], 4, axis=-1)
+        for layer in self.layers:
+            hidden = np.tanh(hidden * 0.01 + layer.index)
+            for hook in list(layer.hooks):
+                hook(layer, (), torch.tensor(hidden))
+
+
+class TinyTokenizer:
+    """Word-level tokenizer; like GPT-2 it has no pad token by default"""
+
+    def __init__(self, padding_side="right", pad_token=None, eos_token="</s>"):
+        self.padding_side = padding_side
+        self.pad_token = pad_token
+        self.eos_token = eos_token
+
+    def __call__(self, texts, return_tensors=None, padding=False, truncation=False):
+        rows = [[sum(map(ord, word)) % 97 + 1 for word in text.split()] for text in texts]
+        width = max(map(len, rows))
+        if any(len(row) != width for row in rows) and not padding:
+            raise ValueError("Unable to create tensor, you should activate padding")
+        if padding and self.pad_token is None:
+            raise ValueError("Asking to pad but the tokenizer does not have a padding token")
+
+        def pad(row):
+            fill = [0] * (width - len(row))
+            return fill + row if self.padding_side == "left" else row + fill
+
+        return {
+            "input_ids": torch.tensor([pad(row) for row in rows]),
+            "attention_mask": torch.tensor([pad([1] * len(row)) for row in rows]),
+        }
+
+
+CLAIMS = ["the vaccine is safe", "short", "a b c d e f g"]
+
+
+def _cache(tokenizer=None, **kwargs):
+    return ActivationCache(TinyModel(), tokenizer or TinyTokenizer(),
+                           probe_layers=["layer.0", "layer.2"], **kwargs)
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+def test_single_claim_needs_no_pad_token():
+    """get() on a tokenizer without a pad token works, as at baseline"""
+    activations = _cache(TinyTokenizer(eos_token=None)).get(CLAIMS[0])
+    assert activations.shape == (2, 4, 4)
+
+
+@pytest.mark.parametrize("padding_side", ["right", "left"])
+@pytest.mark.parametrize("pad_token, eos_token", [
+    (None, "</s>"),     # padded with EOS
+    (None, None),       # no pad or EOS token: one claim at a time
+    ("<pad>", "</s>"),
+])
+def test_batch_matches_single_claims(padding_side, pad_token, eos_token):
+    """A padded batch keeps exactly each claim's real tokens"""
+    batch = _cache(TinyTokenizer(padding_side, pad_token, eos_token)).get_many(CLAIMS)
+    for claim, activations in zip(CLAIMS, batch):
+        alone = _cache().get(claim)
+        assert activations.shape == (2, len(claim.split()), 4)
+        np.testing.assert_array_equal(activations, alone)
+
+
+def test_hits_misses_and_eviction():
+    """Repeats are served from the cache; the least recently used claim is evicted"""
+    cache = _cache(max_entries=2)
+    model = cache.model
+
+    first = cache.get("alpha beta")
+    cache.get("gamma")
+    assert model.forward_calls == 2
+    assert cache.get_stats() == {"hits": 0, "misses": 2, "size": 2}
+
+    assert cache.get("alpha beta") is first  # hit, and now most recently used
+    assert model.forward_calls == 2
+
+    cache.get("delta")                       # evicts "gamma"
+    assert cache.get_stats() == {"hits": 1, "misses": 3, "size": 2}
+    cache.get("alpha beta")
+    assert model.forward_calls == 3
+    cache.get("gamma")                       # a miss again
+    assert model.forward_calls == 4
+    assert cache.get_stats() == {"hits": 2, "misses": 4, "size": 2}
+
+
+def test_get_many_batches_misses_once():
+    """One forward pass for all new claims; a repeated new claim is one miss"""
+    cache = _cache()
+    cache.get("short")
+    results = cache.get_many(["short", "the vaccine is safe", "a b c d e f g",
+                              "the vaccine is safe"])
+    assert cache.model.forward_calls == 2
+    assert results[1] is results[3]
+    assert cache.get_stats() == {"hits": 1, "misses": 3, "size": 3}
+
+
+def test_clear_and_close():
+    """clear() empties the cache; close() removes the probe hooks"""
+    cache = _cache()
+    cache.get("short")
+    cache.clear()
+    assert cache.get_stats() == {"hits": 0, "misses": 0, "size": 0}
+    cache.close()
+    assert all(not layer.hooks for layer in cache.model.layers)
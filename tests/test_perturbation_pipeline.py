@@ -0,0 +1,114 @@
+"""
+=============================================================================
+COGNIGUARD - PERTURBATION PIPELINE DATASET TESTS
+=============================================================================
+generate_dataset() must produce the same entries and statistics whether it
+runs in-process, streams through iter_dataset(), writes JSON Lines to
+output_path or spreads the claims over worker processes.
+
+LLM_REWRITE picks its phrasing at random (and with it the similarity and
+validity), so its rows are compared by (original, type, budget) only;
+every other row must match exactly.
+
+Run with: python -m pytest tests/test_perturbation_pipeline.py
+=============================================================================
+"""
+
+import contextlib
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from cogniguard.perturbation_pipeline import PerturbationPipeline
+
+
+CLAIMS = [
+    "The vaccine is safe and effective.",
+    "The earth is round.",
+    "Climate change is caused by humans.",
+    "The CDC said Dr. Smith is right.",
+    "The vaccine is safe and effective.",
+]
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline = PerturbationPipeline(verbose=False)
+    yield pipeline
+    pipeline.close()
+
+
+def _comparable(entries):
+    rows = []
+    for entry in entries:
+        if entry["type"] == "llm_rewrite":
+            entry = {key: entry[key] for key in ("original", "type", "budget")}
+        rows.append(json.dumps(entry, sort_keys=True))
+    return rows
+
+
+def _stats_of(entries):
+    """generate_dataset()-style statistics recomputed from the entries"""
+    stats = {"total_perturbations": len(entries),
+             "valid_perturbations": sum(entry["valid"] for entry in entries),
+             "by_type": {}, "by_budget": {"low": 0, "high": 0}}
+    for entry in entries:
+        stats["by_type"][entry["type"]] = stats["by_type"].get(entry["type"], 0) + 1
+        stats["by_budget"][entry["budget"]] += 1
+    return stats
+
+
+def _check_stats(stats, entries):
+    expected = _stats_of(entries)
+    assert stats["total_claims"] == len(CLAIMS)
+    assert stats["total_perturbations"] == expected["total_perturbations"]
+    assert stats["valid_perturbations"] == expected["valid_perturbations"]
+    assert (stats["invalid_perturbations"] ==
+            expected["total_perturbations"] - expected["valid_perturbations"])
+    assert {t: n for t, n in stats["by_type"].items() if n} == expected["by_type"]
+    assert stats["by_budget"] == expected["by_budget"]
+
+
+@pytest.mark.parametrize("only_valid", [True, False])
+def test_iter_dataset_matches_generate_dataset(pipeline, only_valid):
+    """Streaming gives the same entries and statistics as the in-memory dataset"""
+    in_memory = pipeline.generate_dataset(CLAIMS, only_valid=only_valid)
+    stats = {"total_claims": 0, "total_perturbations": 0, "valid_perturbations": 0,
+             "invalid_perturbations": 0,
+             "by_type": dict.fromkeys(in_memory["statistics"]["by_type"], 0),
+             "by_budget": {"low": 0, "high": 0}}
+    streamed = list(pipeline.iter_dataset(CLAIMS, only_valid=only_valid, stats=stats))
+
+    assert _comparable(streamed) == _comparable(in_memory["dataset"])
+    _check_stats(in_memory["statistics"], in_memory["dataset"])
+    _check_stats(stats, streamed)
+
+
+def test_output_path_writes_the_dataset(pipeline, tmp_path):
+    """output_path writes one JSON line per entry instead of returning them"""
+    in_memory = pipeline.generate_dataset(CLAIMS, only_valid=False)
+    path = tmp_path / "dataset.jsonl"
+    written = pipeline.generate_dataset(CLAIMS, only_valid=False, output_path=str(path))
+
+    assert "dataset" not in written
+    assert written["output_path"] == str(path)
+    entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert _comparable(entries) == _comparable(in_memory["dataset"])
+    _check_stats(written["statistics"], entries)
+
+
+def test_workers_match_in_process(pipeline):
+    """Worker processes return the same entries, in claim order"""
+    in_process = pipeline.generate_dataset(CLAIMS, only_valid=False)
+    parallel = pipeline.generate_dataset(CLAIMS, only_valid=False, workers=2)
+
+    assert _comparable(parallel["dataset"]) == _comparable(in_process["dataset"])
+    _check_stats(parallel["statistics"], parallel["dataset"])